@@ -6,13 +6,16 @@ import networkx as nx
 from algorithms.helpers import (
     satisfies_degree,
     select_farthest_node,
-    assign_nodes_to_centers,
-    update_centers,
-    compute_path_lengths,
-    compute_node_average_degree
+    degree_eligibility_mask,
+    make_assign_fn,
+    local_k_means_cycle,
+    compute_node_average_degree,
+    LOCAL_CYCLE_MAX_ITERATIONS
 )
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.instrumentation import NULL_PROFILER
 
-def best_initial_center(G):
+def best_initial_center(G, delay_matrix=None):
     """
     Algorithm 1: Selects the initial cluster center for Advanced K-Means.
     The node with the highest degree (and degree >= avg_degree) is chosen.
@@ -21,6 +24,8 @@ def best_initial_center(G):
 
     Args:
         G (nx.Graph): The input undirected graph with delay-weighted edges.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
 
     Returns:
         int: Node ID of the selected best center.
@@ -30,7 +35,8 @@ def best_initial_center(G):
     degrees = dict(G.degree())
     avg_degree = compute_node_average_degree(G)
 
-    path_lengths = compute_path_lengths(G)
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
 
     candidates = [n for n in nodes if satisfies_degree(n, degrees, avg_degree)]
     if not candidates:
@@ -40,56 +46,118 @@ def best_initial_center(G):
     min_sum_dist = float('inf')
     for n in candidates:
         if degrees[n] == max_deg:
-            sum_dist = sum(path_lengths[n][m] for m in nodes)
+            sum_dist = sum(delay_matrix.row(n).tolist())
             if sum_dist < min_sum_dist:
                 min_sum_dist = sum_dist
                 best = n
     return best
 
-def advanced_k_means(G, k):
+def advanced_k_means_sweep(
+    G, kmax, delay_matrix=None, assigner=None, profiler=None, max_iterations=LOCAL_CYCLE_MAX_ITERATIONS
+):
     """
-    Performs the Advanced K-Means clustering for SDN controller placement.
-    This implementation follows Algorithm 2 from the paper:
-    "Optimizing SDN Controller to Switch Latency for Controller Placement Problem" (F. Zobary, 2024).
+    Runs Advanced K-Means incrementally for k = 1..kmax in a single pass.
 
-    The algorithm iteratively selects controller locations (centers) to minimize
-    the average propagation delay between controllers and switches.
-    After adding each center, a local K-Means cycle is performed for the current number of centers.
+    Advanced K-Means is deterministic and the solution for k is built on top of the
+    solution for k-1 (a new farthest center followed by a local K-Means cycle), so
+    every intermediate solution of one kmax run equals the result of advanced_k_means(G, k).
+
+    If no eligible center can be added at some k, the last solution is repeated
+    for all remaining k values (the same result advanced_k_means would return).
 
     Args:
         G (nx.Graph): Undirected graph with delay-weighted edges (attribute "delay_ms").
-        k (int): Number of controllers (clusters).
-
-    Returns:
-        controllers (list): List of selected controller node ids.
-        clusters (dict): Mapping from controller node id to set of assigned node ids.
+        kmax (int): Maximum number of controllers (clusters).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
+        assigner (BoundedAssigner, optional): Bounded assignment step built on the same
+            delay matrix (see algorithms.bounded_assignment); its counters report the
+            pruned comparisons. The plain vectorized assignment is used if None.
+        profiler (Profiler, optional): Collects per-phase timings and counters
+            (see algorithms.instrumentation). Its state after yielding k covers steps 1..k.
+            The 'local_cycle_iterations' counter reports the number of iterations.
+        max_iterations (int): Iteration budget of each local K-Means cycle (see local_k_means_cycle).
+
+    Yields:
+        tuple: (k, controllers, clusters, iterations) for k = 1..kmax, where controllers is a list
+            of controller node ids, clusters maps controller node id to set of assigned node ids
+            and iterations is the number of local K-Means cycle passes of step k (0 for k = 1 and
+            for the repeated solutions).
     """
     nodes = list(G.nodes())
     degrees = dict(G.degree())
     avg_degree = compute_node_average_degree(G)
+    profiler = profiler or NULL_PROFILER
 
-    path_lengths = compute_path_lengths(G)
+    if delay_matrix is None:
+        with profiler.phase("delay_matrix"):
+            delay_matrix = compute_delay_matrix(G)
+    eligible_mask = degree_eligibility_mask(delay_matrix, degrees, avg_degree)
+    assign = make_assign_fn(delay_matrix, assigner)
 
     # Step 1: Select the first center (Algorithm 1)
-    centers = [best_initial_center(G)]
+    with profiler.phase("initial_center"):
+        centers = [best_initial_center(G, delay_matrix)]
+    with profiler.phase("assignment"):
+        clusters = assign(centers)
+    yield 1, list(centers), clusters, 0
 
     j = 2
-    while j <= k:
-        next_center = select_farthest_node(
-            nodes, centers, degrees, avg_degree, path_lengths
-        )
+    while j <= kmax:
+        with profiler.phase("next_center"):
+            next_center = select_farthest_node(
+                nodes, centers, degrees, avg_degree, delay_matrix
+            )
+        profiler.count("distance_lookups", len(delay_matrix) * len(centers))
         if next_center is None:
             print(f"Warning: No eligible center found for k={j}. Stopping at {len(centers)} centers.")
             break
-        else:
-            centers.append(next_center)
-            while True:
-                clusters = assign_nodes_to_centers(centers, nodes, path_lengths)
-                new_centers = update_centers(clusters, degrees, avg_degree, path_lengths)
-                if set(new_centers) == set(centers):
-                    break
-                centers = new_centers
-            j += 1
-
-    clusters = assign_nodes_to_centers(centers, nodes, path_lengths)
+        centers.append(next_center)
+        centers, iterations = local_k_means_cycle(
+            centers, assign, eligible_mask, delay_matrix, profiler, max_iterations
+        )
+        with profiler.phase("assignment"):
+            clusters = assign(centers)
+        yield j, list(centers), clusters, iterations
+        j += 1
+
+    # No more eligible centers: the solution stays the same for the remaining k values
+    while j <= kmax:
+        with profiler.phase("assignment"):
+            clusters = assign(centers)
+        yield j, list(centers), clusters, 0
+        j += 1
+
+def advanced_k_means(
+    G, k, delay_matrix=None, assigner=None, profiler=None, max_iterations=LOCAL_CYCLE_MAX_ITERATIONS
+):
+    """
+    Performs the Advanced K-Means clustering for SDN controller placement.
+    This implementation follows Algorithm 2 from the paper:
+    "Optimizing SDN Controller to Switch Latency for Controller Placement Problem" (F. Zobary, 2024).
+
+    The algorithm iteratively selects controller locations (centers) to minimize
+    the average propagation delay between controllers and switches.
+    After adding each center, a local K-Means cycle is performed for the current number of centers.
+    Use advanced_k_means_sweep to obtain the solutions for all k = 1..kmax in one pass.
+
+    Args:
+        G (nx.Graph): Undirected graph with delay-weighted edges (attribute "delay_ms").
+        k (int): Number of controllers (clusters).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given; pass it to reuse one APSP across many runs.
+        assigner (BoundedAssigner, optional): Bounded assignment step (see advanced_k_means_sweep).
+        profiler (Profiler, optional): Collects per-phase timings and counters
+            (see algorithms.instrumentation).
+        max_iterations (int): Iteration budget of each local K-Means cycle (see local_k_means_cycle).
+
+    Returns:
+        controllers (list): List of selected controller node ids.
+        clusters (dict): Mapping from controller node id to set of assigned node ids.
+    """
+    # The sweep stops at k, so its last solution is the answer for k
+    for _, centers, clusters, _ in advanced_k_means_sweep(
+        G, max(k, 1), delay_matrix, assigner, profiler, max_iterations
+    ):
+        pass
     return centers, clusters
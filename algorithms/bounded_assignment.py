@@ -0,0 +1,169 @@
+# === Bounded Assignment ===
+# Hamerly-style triangle-inequality bounds for the assignment step of the local K-Means cycle
+
+import numpy as np
+
+from algorithms.instrumentation import NULL_PROFILER
+
+# Relative slack on the pruning test: float sums of path delays may violate the
+# triangle inequality in the last bits, so near-equal bounds are always checked exactly
+BOUND_SLACK = 1e-9
+
+
+def clusters_from_labels(centers, labels, delay_matrix):
+    """
+    Builds the cluster dict from an array of center positions.
+
+    Args:
+        centers (list): List of center node IDs.
+        labels (np.ndarray): Integer array (matrix order) of center positions.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Returns:
+        dict: Mapping {center_node: set of assigned node IDs}.
+    """
+    nodes = delay_matrix.nodes
+    return {
+        c: set(nodes[i] for i in np.flatnonzero(labels == j))
+        for j, c in enumerate(centers)
+    }
+
+
+class BoundedAssigner:
+    """
+    Assignment step with per-node distance bounds (Hamerly's algorithm).
+
+    For every node it keeps an upper bound on the delay to its assigned center and a
+    lower bound on the delay to any other center. When the centers move between
+    iterations of the local K-Means cycle, the bounds are shifted by the distance each
+    center moved. A node keeps its center without any comparison if its upper bound is
+    below its lower bound or below half the distance from its center to the nearest
+    other center. Only the remaining nodes are compared against all centers.
+
+    The result is identical to assign_nodes_to_centers_vectorized (ties go to the center
+    listed first, every center is assigned to itself): a node is only skipped when its center
+    is strictly the closest one.
+
+    The bounds are kept between calls and reused when the number of centers is unchanged
+    (center j of the new list is treated as the moved center j of the previous call);
+    otherwise a full assignment pass rebuilds them.
+
+    Attributes:
+        calls (int): Number of assignment passes.
+        computed (int): Number of node-center (and center-center) delays looked up.
+        pruned (int): Number of node-center comparisons skipped thanks to the bounds.
+    """
+
+    def __init__(self, delay_matrix, profiler=None):
+        """
+        Args:
+            delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+            profiler (Profiler, optional): Also receives the pruned comparisons of every pass
+                (counter 'assignment_pruned', see algorithms.instrumentation).
+        """
+        self.delay_matrix = delay_matrix
+        self.profiler = profiler or NULL_PROFILER
+        self.calls = 0
+        self.computed = 0
+        self.pruned = 0
+        self.reset()
+
+    def reset(self):
+        """Drops the bounds, so the next call does a full assignment pass."""
+        self._center_idx = None
+        self._labels = None
+        self._upper = None
+        self._lower = None
+
+    def counters(self):
+        """
+        Returns:
+            dict: {'calls', 'computed', 'pruned'} counters.
+        """
+        return {"calls": self.calls, "computed": self.computed, "pruned": self.pruned}
+
+    def assign(self, centers):
+        """
+        Assigns every node to its closest center.
+
+        Args:
+            centers (list): List of center node IDs.
+
+        Returns:
+            dict: Mapping {center_node: set of assigned node IDs}.
+        """
+        self.calls += 1
+        pruned = self.pruned
+        center_idx = self.delay_matrix.indices(centers)
+        if self._center_idx is None or len(center_idx) != len(self._center_idx):
+            self._full_pass(center_idx)
+        else:
+            self._bounded_pass(center_idx)
+        # Every center owns itself; zero is a valid lower bound for the other centers
+        self._labels[center_idx] = np.arange(len(center_idx))
+        self._upper[center_idx] = 0.0
+        self._lower[center_idx] = 0.0
+        self._center_idx = center_idx
+        self.profiler.count("assignment_pruned", self.pruned - pruned)
+        return clusters_from_labels(centers, self._labels, self.delay_matrix)
+
+    def _nearest_two(self, dists):
+        """Nearest center position, its delay and the second smallest delay for each row."""
+        rows = np.arange(dists.shape[0])
+        labels = np.argmin(dists, axis=1)
+        upper = dists[rows, labels]
+        if dists.shape[1] > 1:
+            others = dists.copy()
+            others[rows, labels] = np.inf
+            lower = others.min(axis=1)
+        else:
+            lower = np.full(dists.shape[0], np.inf)
+        return labels, upper, lower
+
+    def _full_pass(self, center_idx):
+        dists = self.delay_matrix.matrix[:, center_idx]
+        self.computed += dists.size
+        self._labels, self._upper, self._lower = self._nearest_two(dists)
+
+    def _bounded_pass(self, center_idx):
+        matrix = self.delay_matrix.matrix
+        k = len(center_idx)
+        labels, upper, lower = self._labels, self._upper, self._lower
+
+        # Shift the bounds by how far every center moved
+        moved = matrix[self._center_idx, center_idx]
+        self.computed += k
+        upper += moved[labels]
+        if k > 1:
+            order = np.argsort(moved)
+            largest, second = moved[order[-1]], moved[order[-2]]
+            # The lower bound drops by the largest move among the other centers
+            lower -= np.where(labels == order[-1], second, largest)
+
+        # Half the distance from every center to its nearest other center
+        if k > 1:
+            between = matrix[np.ix_(center_idx, center_idx)].copy()
+            self.computed += k * k
+            np.fill_diagonal(between, np.inf)
+            half_sep = between.min(axis=1) / 2
+        else:
+            half_sep = np.full(1, np.inf)
+
+        bound = np.maximum(half_sep[labels], lower) * (1 - BOUND_SLACK)
+        check = np.flatnonzero(~(upper < bound))
+        self.pruned += (len(labels) - len(check)) * k
+        if not len(check):
+            return
+
+        # Tighten the upper bound with the exact delay to the assigned center
+        upper[check] = matrix[check, center_idx[labels[check]]]
+        self.computed += len(check)
+        still = check[~(upper[check] < bound[check])]
+        self.pruned += (len(check) - len(still)) * (k - 1)
+        if not len(still):
+            return
+
+        # Full comparison for the remaining nodes
+        dists = matrix[np.ix_(still, center_idx)]
+        self.computed += dists.size
+        labels[still], upper[still], lower[still] = self._nearest_two(dists)
@@ -0,0 +1,564 @@
+# === Delay Matrix ===
+# All-pairs shortest path delays (dense, or computed on demand for large graphs) shared by every step of the clustering algorithms
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import networkx as nx
+import numpy as np
+
+from algorithms.topology import Topology, as_networkx
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+except ImportError:  # SciPy is optional, NetworkX Dijkstra is used without it
+    csr_matrix = None
+    csgraph_dijkstra = None
+
+# Number of rows processed at once by bulk passes over the matrix
+ROW_BLOCK = 256
+
+# Default memory budget of the LazyDelayMatrix row cache
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+# Largest graph for which make_delay_matrix builds a dense matrix (5000 nodes = 200 MB)
+DENSE_MAX_NODES = 5000
+
+
+class DelayMatrix:
+    """
+    All-pairs shortest path delays stored as a dense NumPy array together with
+    the mapping between node IDs and matrix rows/columns.
+
+    The matrix is built once per graph and then passed to every helper, so that
+    a whole k=1..kmax sweep performs a single all-pairs Dijkstra.
+
+    Attributes:
+        nodes (list): Node IDs in matrix order (same order as G.nodes()).
+        index (dict): Mapping {node: row/column index}.
+        matrix (np.ndarray): Array of shape (n, n); matrix[i, j] is the shortest
+            delay (ms) between nodes[i] and nodes[j], np.inf if unreachable.
+            May be a read-only numpy.memmap (see compute_delay_matrix).
+    """
+
+    def __init__(self, nodes, matrix):
+        self.nodes = list(nodes)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __reduce__(self):
+        # A memory-mapped matrix is sent to worker processes as its file name, not its content
+        if isinstance(self.matrix, np.memmap) and self.matrix.filename is not None:
+            return _open_memmapped, (self.nodes, self.matrix.filename)
+        return DelayMatrix, (self.nodes, self.matrix)
+
+    def indices(self, nodes):
+        """
+        Converts node IDs to matrix indices.
+
+        Args:
+            nodes (iterable): Node IDs.
+
+        Returns:
+            np.ndarray: Integer array of matrix indices (same order as nodes).
+        """
+        return np.fromiter((self.index[n] for n in nodes), dtype=np.intp)
+
+    def row(self, node):
+        """
+        Returns the delays from a node to all nodes (in matrix order).
+        """
+        return self.matrix[self.index[node]]
+
+    def distance(self, u, v):
+        """
+        Returns the shortest path delay between two nodes.
+        """
+        return float(self.matrix[self.index[u], self.index[v]])
+
+    def rows(self, idx):
+        """
+        Returns the delays from the nodes at matrix indices idx to all nodes, shape (len(idx), n).
+        """
+        return self.matrix[idx]
+
+    def columns(self, idx, row_idx=None):
+        """
+        Returns the delays from all nodes (or the nodes at matrix indices row_idx, in that order)
+        to the nodes at matrix indices idx, shape (n, len(idx)).
+        """
+        if row_idx is None:
+            return self.matrix[:, idx]
+        return self.matrix[np.ix_(row_idx, idx)]
+
+    def iter_row_blocks(self, block_size=ROW_BLOCK):
+        """
+        Iterates over the whole matrix in blocks of rows.
+
+        Yields:
+            tuple: (row indices, array of shape (len(row indices), n)).
+        """
+        for start in range(0, len(self), block_size):
+            idx = np.arange(start, min(start + block_size, len(self)))
+            yield idx, self.matrix[idx]
+
+    def min_distances(self, center_idx):
+        """
+        Returns, for every node, the delay to its closest center.
+
+        Args:
+            center_idx (np.ndarray): Matrix indices of the centers.
+
+        Returns:
+            np.ndarray: Array of shape (n,).
+        """
+        return self.matrix[:, center_idx].min(axis=1)
+
+    def nearest(self, center_idx):
+        """
+        Returns, for every node, the position (in center_idx) of its closest center.
+        Ties are resolved in favour of the center listed first.
+
+        Args:
+            center_idx (np.ndarray): Matrix indices of the centers.
+
+        Returns:
+            np.ndarray: Integer array of shape (n,) of center positions.
+        """
+        return np.argmin(self.matrix[:, center_idx], axis=1)
+
+    def row_sums(self, row_idx, col_idx=None):
+        """
+        Sums the delays from each node in row_idx to the nodes in col_idx (all nodes if None),
+        strictly left to right (see sequential_row_sums).
+
+        Returns:
+            np.ndarray: Array of shape (len(row_idx),).
+        """
+        if col_idx is None:
+            return sequential_row_sums(self.matrix[row_idx])
+        return sequential_row_sums(self.matrix[np.ix_(row_idx, col_idx)])
+
+    def medoid(self, row_idx, col_idx, start=None):
+        """
+        Returns the position (in row_idx) of the node with the smallest row_sums(row_idx, col_idx).
+        Ties are resolved in favour of the node listed first; start is unused (see LazyDelayMatrix).
+        """
+        return int(np.argmin(self.row_sums(row_idx, col_idx)))
+
+
+def _open_memmapped(nodes, path):
+    return DelayMatrix(nodes, np.load(path, mmap_mode='r'))
+
+
+def csr_adjacency(G, index, weight='delay_ms'):
+    """
+    Builds the symmetric SciPy CSR adjacency matrix of G. Both directions of every edge are
+    stored, so csgraph can run it as directed without converting it on every call; for
+    parallel edges only the shortest one is kept. The CSR arrays of a Topology are used as is.
+
+    Args:
+        G (nx.Graph or Topology): Input graph with delay-weighted edges.
+        index (dict): Mapping {node: row/column index} (G.nodes() order for a Topology).
+        weight (str): Edge attribute used as the edge length.
+
+    Returns:
+        scipy.sparse.csr_matrix: Array of shape (n, n) of edge lengths.
+    """
+    if isinstance(G, Topology):
+        return csr_matrix((G.edge_values(weight), G.indices, G.indptr), shape=(len(index), len(index)))
+    lengths = {}
+    for u, v, w in G.edges(data=weight):
+        i, j = index[u], index[v]
+        key = (min(i, j), max(i, j))
+        lengths[key] = min(w, lengths.get(key, np.inf))
+    pairs = np.array(list(lengths.keys()), dtype=np.intp).reshape(-1, 2)
+    values = np.fromiter(lengths.values(), dtype=float, count=len(lengths))
+    return csr_matrix(
+        (np.concatenate([values, values]),
+         (np.concatenate([pairs[:, 0], pairs[:, 1]]), np.concatenate([pairs[:, 1], pairs[:, 0]]))),
+        shape=(len(index), len(index))
+    )
+
+
+class LazyDelayMatrix:
+    """
+    Shortest path delays computed on demand, for graphs too large for a dense n x n matrix.
+
+    Provides the same interface as DelayMatrix (except the dense .matrix attribute):
+    rows are computed with Dijkstra per needed source and kept in an LRU cache bounded by
+    max_cache_bytes, closest-center queries run one multi-source Dijkstra from the centers,
+    and bulk passes (row sums, centralities) are processed in blocks that are not cached.
+    SciPy's csgraph Dijkstra is used when SciPy is installed, NetworkX otherwise.
+
+    The graph is treated as undirected, so columns are served as rows.
+    Only the algorithms built on these methods (Advanced K-Means, Enhanced K-Means++, Swap
+    K-Medoids and the latency evaluation of compute_latencies_for_experiment) support the lazy
+    matrix; the bounded assignment and evaluate_placements need a dense DelayMatrix. Swap K-Medoids
+    reads the rows of every candidate at each swap, so it is only practical with a dense matrix.
+
+    Attributes:
+        nodes (list): Node IDs in matrix order (same order as G.nodes()).
+        index (dict): Mapping {node: row/column index}.
+        max_rows (int): Capacity of the row cache.
+    """
+
+    def __init__(self, G, weight='delay_ms', max_cache_bytes=DEFAULT_CACHE_BYTES, backend='auto'):
+        """
+        Args:
+            G (nx.Graph or Topology): Input graph with delay-weighted edges.
+            weight (str): Edge attribute used as the edge length.
+            max_cache_bytes (int): Memory budget of the row cache (also bounds the size of
+                the row blocks computed at once).
+            backend (str): Dijkstra implementation, 'scipy', 'networkx' or 'auto'
+                (SciPy when installed).
+        """
+        self.nodes = list(G.nodes())
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.weight = weight
+        n = len(self.nodes)
+        self.max_rows = max(1, int(max_cache_bytes // (8 * max(n, 1))))
+        self.block_size = min(ROW_BLOCK, self.max_rows)
+        self._cache = OrderedDict()
+
+        if backend == 'auto':
+            backend = 'networkx' if csgraph_dijkstra is None else 'scipy'
+        if backend == 'scipy' and csgraph_dijkstra is None:
+            raise ImportError("SciPy is required for the 'scipy' delay matrix backend.")
+        if backend not in ('scipy', 'networkx'):
+            raise ValueError(f"Unknown delay matrix backend: {backend}")
+        self._graph = csr_adjacency(G, self.index, weight) if backend == 'scipy' else as_networkx(G)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def indices(self, nodes):
+        """
+        Converts node IDs to matrix indices.
+        """
+        return np.fromiter((self.index[n] for n in nodes), dtype=np.intp)
+
+    def _dijkstra(self, idx, limit=np.inf):
+        """
+        Runs Dijkstra from every source in idx (no caching). Delays above limit are np.inf.
+        """
+        if not isinstance(self._graph, nx.Graph):
+            return np.atleast_2d(csgraph_dijkstra(self._graph, directed=True, indices=idx, limit=limit))
+        block = np.full((len(idx), len(self)), np.inf)
+        cutoff = None if np.isinf(limit) else limit
+        for r, i in enumerate(idx):
+            lengths = nx.single_source_dijkstra_path_length(
+                self._graph, self.nodes[i], cutoff=cutoff, weight=self.weight
+            )
+            block[r, self.indices(lengths.keys())] = list(lengths.values())
+        return block
+
+    def rows(self, idx):
+        """
+        Returns the delays from the nodes at matrix indices idx to all nodes, shape (len(idx), n).
+        Missing rows are computed together and stored in the LRU cache.
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        missing = [i for i in dict.fromkeys(idx.tolist()) if i not in self._cache]
+        for start in range(0, len(missing), self.block_size):
+            chunk = missing[start:start + self.block_size]
+            for i, row in zip(chunk, self._dijkstra(chunk)):
+                self._cache[i] = row
+                if len(self._cache) > self.max_rows:
+                    self._cache.popitem(last=False)
+        out = np.empty((len(idx), len(self)))
+        for r, i in enumerate(idx.tolist()):
+            row = self._cache.get(i)
+            if row is None:
+                # Evicted while computing a request larger than the cache
+                row = self._dijkstra([i])[0]
+            else:
+                self._cache.move_to_end(i)
+            out[r] = row
+        return out
+
+    def row(self, node):
+        """
+        Returns the delays from a node to all nodes (in matrix order).
+        """
+        return self.rows([self.index[node]])[0]
+
+    def distance(self, u, v):
+        """
+        Returns the shortest path delay between two nodes.
+        """
+        return float(self.row(u)[self.index[v]])
+
+    def columns(self, idx, row_idx=None):
+        """
+        Returns the delays from all nodes (or the nodes at matrix indices row_idx, in that order)
+        to the nodes at matrix indices idx, shape (n, len(idx)).
+        """
+        if row_idx is None:
+            return self.rows(idx).T
+        return self.rows(idx)[:, row_idx].T
+
+    def iter_row_blocks(self, block_size=None):
+        """
+        Iterates over all rows in blocks (computed on the fly, not cached).
+
+        Yields:
+            tuple: (row indices, array of shape (len(row indices), n)).
+        """
+        block_size = block_size or self.block_size
+        for start in range(0, len(self), block_size):
+            idx = np.arange(start, min(start + block_size, len(self)))
+            yield idx, self._dijkstra(idx)
+
+    def _multi_source(self, center_idx):
+        """
+        One multi-source Dijkstra from the centers: (delay to the closest center, its matrix index).
+        """
+        if not isinstance(self._graph, nx.Graph):
+            dists, _, sources = csgraph_dijkstra(
+                self._graph, directed=True, indices=center_idx,
+                min_only=True, return_predecessors=True
+            )
+            return dists, sources
+        dists = np.full(len(self), np.inf)
+        sources = np.full(len(self), -1, dtype=np.intp)
+        lengths, paths = nx.multi_source_dijkstra(
+            self._graph, [self.nodes[i] for i in center_idx], weight=self.weight
+        )
+        for node, path in paths.items():
+            dists[self.index[node]] = lengths[node]
+            sources[self.index[node]] = self.index[path[0]]
+        return dists, sources
+
+    def min_distances(self, center_idx):
+        """
+        Returns, for every node, the delay to its closest center (one multi-source Dijkstra).
+        """
+        return self._multi_source(center_idx)[0]
+
+    def nearest(self, center_idx):
+        """
+        Returns, for every node, the position (in center_idx) of its closest center, found by one
+        multi-source Dijkstra. Equally close centers may be resolved differently than in DelayMatrix;
+        unreachable nodes get position 0.
+        """
+        _, sources = self._multi_source(center_idx)
+        position = np.zeros(len(self), dtype=np.intp)
+        for pos, i in reversed(list(enumerate(np.asarray(center_idx).tolist()))):
+            position[sources == i] = pos
+        return position
+
+    def row_sums(self, row_idx, col_idx=None):
+        """
+        Sums the delays from each node in row_idx to the nodes in col_idx (all nodes if None),
+        strictly left to right, processing the rows in blocks.
+
+        When col_idx is given, every Dijkstra stops at the largest delay from the first row node
+        to the other row nodes plus the largest delay from it to the col_idx nodes: by the triangle
+        inequality no requested delay is above that limit. For the members of one cluster only a
+        ball around the cluster is explored instead of the whole graph.
+
+        Returns:
+            np.ndarray: Array of shape (len(row_idx),).
+        """
+        row_idx = np.asarray(row_idx, dtype=np.intp)
+        limit = np.inf
+        if col_idx is not None and len(row_idx) and len(col_idx):
+            first = self.rows(row_idx[:1])[0]
+            # Slack for the rounding of path sums
+            limit = (first[row_idx].max() + first[col_idx].max()) * (1 + 1e-9)
+        sums = np.empty(len(row_idx))
+        for start in range(0, len(row_idx), self.block_size):
+            block = self._dijkstra(row_idx[start:start + self.block_size], limit)
+            if col_idx is not None:
+                block = block[:, col_idx]
+            sums[start:start + self.block_size] = sequential_row_sums(block)
+        return sums
+
+    def medoid(self, row_idx, col_idx, start=None):
+        """
+        Returns the position (in row_idx) of the node with the smallest row_sums(row_idx, col_idx),
+        without computing the row of every candidate.
+
+        Every computed row p gives the lower bound sum(|d(p, m) - d(p, c)|) over the col_idx nodes m
+        on the sum of candidate c (triangle inequality). Candidates are evaluated in increasing order
+        of their best lower bound, each evaluated row tightening the bounds of the others, until all
+        remaining bounds exceed the best sum found. Ties are resolved in favour of the node listed first.
+
+        Args:
+            row_idx (np.ndarray): Matrix indices of the candidates.
+            col_idx (np.ndarray): Matrix indices of the nodes the delays are summed over.
+            start (int, optional): Matrix index of a node expected to be close to the medoid
+                (e.g. the current cluster center), used as the first row. row_idx[0] if None.
+
+        Returns:
+            int: Position in row_idx.
+        """
+        row_idx = np.asarray(row_idx, dtype=np.intp)
+        col_idx = np.asarray(col_idx, dtype=np.intp)
+        position = {i: pos for pos, i in reversed(list(enumerate(row_idx.tolist())))}
+        bounds = np.zeros(len(row_idx))
+        sums = np.full(len(row_idx), np.inf)
+        pending = np.ones(len(row_idx), dtype=bool)
+        best = np.inf
+        pivot = int(row_idx[0]) if start is None else int(start)
+        while True:
+            row = self.rows([pivot])[0]
+            pos = position.get(pivot)
+            if pos is not None:
+                sums[pos] = sequential_row_sums(row[col_idx][np.newaxis])[0]
+                pending[row_idx == pivot] = False
+                best = min(best, sums[pos])
+            to_cols = row[col_idx]
+            if np.isfinite(to_cols).all():
+                # sum(|a_m - x|) for all candidates x at once, using prefix sums of the sorted a_m
+                to_cols = np.sort(to_cols)
+                prefix = np.concatenate([[0.0], np.cumsum(to_cols)])
+                x = row[row_idx]
+                below = np.searchsorted(to_cols, x)
+                bound = x * below - prefix[below] + (prefix[-1] - prefix[below]) - x * (len(to_cols) - below)
+                np.maximum(bounds, np.where(np.isfinite(bound), bound, 0.0), out=bounds)
+            # Slack for the rounding of path sums
+            candidates = np.flatnonzero(pending & (bounds <= best * (1 + 1e-9)))
+            if not len(candidates):
+                break
+            pivot = int(row_idx[candidates[np.argmin(bounds[candidates])]])
+        return int(np.argmin(sums))
+
+
+def compute_delay_matrix(G, weight='delay_ms', dtype=np.float64, path=None, workers=1, backend='auto'):
+    """
+    Computes all-pairs shortest path delays for the given network using Dijkstra's algorithm.
+
+    Rows are computed in blocks of sources, with SciPy's compiled csgraph Dijkstra on a CSR
+    adjacency when SciPy is installed (NetworkX otherwise). With workers > 1 the sources are
+    sharded across a process pool and every worker writes its rows straight into the shared
+    result (shared memory, or the memory-mapped file).
+
+    With path, the matrix is built directly into a .npy file opened as a numpy.memmap, so it
+    pages in on demand instead of being held in RAM. The file can be reopened later with
+    DelayMatrix(G.nodes(), np.load(path, mmap_mode='r')).
+
+    Args:
+        G (nx.Graph or Topology): Input graph with delay-weighted edges.
+        weight (str): Edge attribute used as the edge length.
+        dtype (np.dtype): Element type of the matrix (np.float32 halves the memory).
+        path (str, optional): .npy file backing the matrix. In memory if None.
+        workers (int): Number of worker processes computing the rows.
+        backend (str): Dijkstra implementation, 'scipy', 'networkx' or 'auto' (see LazyDelayMatrix).
+
+    Returns:
+        DelayMatrix: Dense delay matrix indexed in G.nodes() order.
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    workers = max(1, min(workers, n))
+
+    if workers == 1:
+        if path is None:
+            matrix = np.empty((n, n), dtype=dtype)
+        else:
+            matrix = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n, n))
+        _fill_delay_rows(LazyDelayMatrix(G, weight, backend=backend), np.arange(n), matrix)
+        if path is None:
+            return DelayMatrix(nodes, matrix)
+        matrix.flush()
+        del matrix
+        return DelayMatrix(nodes, np.load(path, mmap_mode='r'))
+
+    shm = None
+    if path is None:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n * n * np.dtype(dtype).itemsize))
+        target = ("shm", shm.name, (n, n), np.dtype(dtype).str)
+    else:
+        np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n, n)).flush()
+        target = ("file", path)
+    try:
+        shards = np.array_split(np.arange(n), min(workers * 4, n))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_fill_worker,
+            initargs=(G, weight, backend, target)
+        ) as executor:
+            list(executor.map(_fill_shard, shards))
+        if path is None:
+            return DelayMatrix(nodes, np.ndarray((n, n), dtype=dtype, buffer=shm.buf).copy())
+        return DelayMatrix(nodes, np.load(path, mmap_mode='r'))
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+def _fill_delay_rows(solver, sources, matrix):
+    """
+    Writes the delays from the nodes at matrix indices sources to all nodes into matrix,
+    one block of rows at a time (solver is a LazyDelayMatrix of the graph).
+    """
+    for start in range(0, len(sources), solver.block_size):
+        block = sources[start:start + solver.block_size]
+        matrix[block] = solver._dijkstra(block)
+
+
+# Row solver and target matrix of a worker process filling a delay matrix
+_fill_state = {}
+
+
+def _init_fill_worker(G, weight, backend, target):
+    _fill_state["solver"] = LazyDelayMatrix(G, weight, backend=backend)
+    if target[0] == "shm":
+        _, name, shape, dtype = target
+        _fill_state["shm"] = shared_memory.SharedMemory(name=name)
+        _fill_state["matrix"] = np.ndarray(shape, dtype=dtype, buffer=_fill_state["shm"].buf)
+    else:
+        _fill_state["matrix"] = np.load(target[1], mmap_mode='r+')
+
+
+def _fill_shard(sources):
+    matrix = _fill_state["matrix"]
+    _fill_delay_rows(_fill_state["solver"], sources, matrix)
+    if isinstance(matrix, np.memmap):
+        matrix.flush()
+
+
+def make_delay_matrix(G, weight='delay_ms', max_dense_nodes=DENSE_MAX_NODES, max_cache_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Builds the delay matrix suited to the size of the graph: a dense DelayMatrix up to
+    max_dense_nodes nodes, a LazyDelayMatrix with a row cache of max_cache_bytes above.
+
+    Args:
+        G (nx.Graph or Topology): Input graph with delay-weighted edges.
+        weight (str): Edge attribute used as the edge length.
+        max_dense_nodes (int): Largest number of nodes for the dense matrix.
+        max_cache_bytes (int): Memory budget of the lazy matrix row cache.
+
+    Returns:
+        DelayMatrix or LazyDelayMatrix: Delay matrix indexed in G.nodes() order.
+    """
+    if G.number_of_nodes() <= max_dense_nodes:
+        return compute_delay_matrix(G, weight)
+    return LazyDelayMatrix(G, weight, max_cache_bytes)
+
+
+def sequential_row_sums(block):
+    """
+    Sums each row of a 2D block strictly left to right.
+
+    np.sum uses pairwise summation, which can round differently from Python's
+    sum(); candidates with (nearly) equal delay sums would then be tie-broken
+    differently. A cumulative sum keeps the exact scalar summation order.
+
+    Args:
+        block (np.ndarray): Array of shape (rows, cols).
+
+    Returns:
+        np.ndarray: Array of shape (rows,) with the row sums.
+    """
+    if block.shape[1] == 0:
+        return np.zeros(block.shape[0])
+    return np.cumsum(block, axis=1)[:, -1]
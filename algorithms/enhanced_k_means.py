@@ -1,18 +1,23 @@
 # === Enhanced K-Means++ ===
 # Main Algorithm 1 (Weighted Initial Center) and Algorithm 2 (Network Partitioning with stochastic cluster selection)
 
-import networkx as nx
+import numpy as np
 
 from algorithms.helpers import (
-    normalize_metrics,
-    satisfies_degree,
+    normalize_metric_arrays,
+    score_initial_centers,
+    degree_eligibility_mask,
     select_stochastic_next_center,
-    assign_nodes_to_centers,
-    update_centers,
-    compute_path_lengths,
+    make_assign_fn,
+    local_k_means_cycle,
     compute_node_average_degree,
-    fix_singleton_clusters
+    compute_centralities,
+    betweenness_sample_count,
+    fix_singleton_clusters,
+    LOCAL_CYCLE_MAX_ITERATIONS
 )
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.instrumentation import NULL_PROFILER
 
 def best_weighted_initial_center(
     G,
@@ -21,6 +26,7 @@ def best_weighted_initial_center(
     w_degree,
     w_betweenness,
     w_closeness,
+    delay_matrix=None,
 ):
     """
     Algorithm 1: Selects the initial cluster center for Enhanced K-Means using a weighted sum
@@ -37,31 +43,78 @@ def best_weighted_initial_center(
         w_degree (float): Weight for degree centrality (normalized).
         w_betweenness (float): Weight for betweenness centrality (normalized).
         w_closeness (float): Weight for closeness centrality (normalized).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
 
     Returns:
         int: Node ID of the selected best center.
     """
-    nodes = list(G.nodes())
+    return best_weighted_initial_centers(
+        G, betweenness, closeness,
+        [(w_degree, w_betweenness, w_closeness)],
+        delay_matrix
+    )[0]
+
+def best_weighted_initial_centers(G, betweenness, closeness, weights, delay_matrix=None):
+    """
+    Vectorized Algorithm 1 for many weight vectors at once: the centralities are normalized
+    once, all eligible candidates are scored for every weight vector in one array operation and
+    the distance sums used for tie-breaking are computed once for all candidates.
+    Gives the same result as best_weighted_initial_center for each weight vector.
+
+    Args:
+        G (nx.Graph): The input undirected graph with delay-weighted edges.
+        betweenness (dict): Mapping {node: betweenness centrality (float)}.
+        closeness (dict): Mapping {node: closeness centrality (float)}.
+        weights (array-like): Array of shape (W, 3) with rows (w_degree, w_betweenness, w_closeness).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
+
+    Returns:
+        list: Node ID of the selected best center for each weight vector (None if no node is eligible).
+    """
     degrees = dict(G.degree())
     avg_degree = compute_node_average_degree(G)
 
-    path_lengths = compute_path_lengths(G)
-
-    candidates = [n for n in nodes if satisfies_degree(n, degrees, avg_degree)]
-    max_score = -float('inf')
-    min_sum = float('inf')
-    best = None
-    for n in candidates:
-        d_norm, b_norm, c_norm = normalize_metrics(n, degrees, betweenness, closeness)
-        score = w_degree * d_norm + w_betweenness * b_norm + w_closeness * c_norm
-        sum_dist = sum(path_lengths[n][m] for m in nodes)
-        if (score > max_score) or (score == max_score and sum_dist < min_sum):
-            best = n
-            max_score = score
-            min_sum = sum_dist
-    return best
-
-def enhanced_k_means(G, k, rng, w_degree, w_betweenness, w_closeness):
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
+
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    candidate_idx = np.flatnonzero(degree_eligibility_mask(delay_matrix, degrees, avg_degree))
+    if not len(candidate_idx):
+        return [None] * len(weights)
+
+    normalized = normalize_metric_arrays(delay_matrix.nodes, degrees, betweenness, closeness)
+    scores = score_initial_centers(normalized[:, candidate_idx], weights)
+
+    # Highest score first, then the smallest sum of distances, then the first candidate
+    ties = scores == scores.max(axis=1, keepdims=True)
+    # Distance sums are only needed for candidates sharing the highest score with another one
+    tied = ties[ties.sum(axis=1) > 1].any(axis=0)
+    sum_dists = np.full(len(candidate_idx), np.inf)
+    sum_dists[tied] = delay_matrix.row_sums(candidate_idx[tied])
+    best = np.argmin(np.where(ties, sum_dists, np.inf), axis=1)
+    rows = np.arange(len(weights))
+    best = np.where(ties[rows, best], best, np.argmax(ties, axis=1))
+    return [delay_matrix.nodes[i] for i in candidate_idx[best]]
+
+def enhanced_k_means(
+    G,
+    k,
+    rng,
+    w_degree,
+    w_betweenness,
+    w_closeness,
+    delay_matrix=None,
+    betweenness=None,
+    closeness=None,
+    betweenness_samples=None,
+    initial_center=None,
+    assigner=None,
+    profiler=None,
+    max_iterations=LOCAL_CYCLE_MAX_ITERATIONS,
+    return_iterations=False,
+):
     """
     Algorithm 2: Enhanced K-Means clustering for SDN controller placement.
     Partitions the graph into k clusters by selecting controller nodes (centers)
@@ -79,44 +132,81 @@ def enhanced_k_means(G, k, rng, w_degree, w_betweenness, w_closeness):
         w_degree (float): Weight for degree centrality in initial center selection.
         w_betweenness (float): Weight for betweenness centrality in initial center selection.
         w_closeness (float): Weight for closeness centrality in initial center selection.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given; pass it to reuse one APSP across many runs.
+        betweenness (dict, optional): Mapping {node: normalized betweenness centrality}.
+        closeness (dict, optional): Mapping {node: closeness centrality}.
+            Both are computed from G if not given; see compute_centralities to compute them
+            once per graph.
+        betweenness_samples (int, optional): Source samples of the betweenness computed when
+            betweenness is not given (see compute_centralities). Exact by default, sampled by
+            default with a LazyDelayMatrix; the sampling is seeded from rng.
+        initial_center (int, optional): Precomputed result of Algorithm 1 (e.g. from
+            best_weighted_initial_centers). If given, the weights and centralities are not used.
+        assigner (BoundedAssigner, optional): Bounded assignment step built on the same delay
+            matrix (see algorithms.bounded_assignment). The plain vectorized assignment is used if None.
+        profiler (Profiler, optional): Collects per-phase timings and counters
+            (see algorithms.instrumentation); 'local_cycle_iterations' reports the number of iterations.
+        max_iterations (int): Iteration budget of each local K-Means cycle (see local_k_means_cycle).
+        return_iterations (bool): Also return the number of local K-Means cycle passes.
 
     Returns:
         tuple:
             - controllers (list): List of selected controller node IDs (cluster centers).
             - clusters (dict): Mapping from controller node ID to set of assigned node IDs in its cluster.
+            - iterations (int): Total number of local K-Means cycle passes over all added centers
+              (only if return_iterations is True).
     """
 
     nodes = list(G.nodes())
     degrees = dict(G.degree())
     avg_degree = compute_node_average_degree(G)
+    profiler = profiler or NULL_PROFILER
 
-    path_lengths = compute_path_lengths(G)
-    betweenness = nx.betweenness_centrality(G, normalized=True, weight='delay_ms')
-    closeness = nx.closeness_centrality(G, distance='delay_ms')
+    if delay_matrix is None:
+        with profiler.phase("delay_matrix"):
+            delay_matrix = compute_delay_matrix(G)
+    eligible_mask = degree_eligibility_mask(delay_matrix, degrees, avg_degree)
+    assign = make_assign_fn(delay_matrix, assigner)
 
     # Step 1: Select the first center using weighted centrality (Algorithm 1)
-    centers = [best_weighted_initial_center(
-        G, betweenness, closeness,
-        w_degree, w_betweenness, w_closeness
-    )]
+    if initial_center is None:
+        if betweenness is None or closeness is None:
+            with profiler.phase("centralities"):
+                sampled = betweenness_sample_count(G, delay_matrix, betweenness_samples) is not None
+                betweenness, closeness = compute_centralities(
+                    G, delay_matrix, betweenness_samples, seed=rng.getrandbits(32) if sampled else None
+                )
+        with profiler.phase("initial_center"):
+            initial_center = best_weighted_initial_center(
+                G, betweenness, closeness,
+                w_degree, w_betweenness, w_closeness,
+                delay_matrix
+            )
+    centers = [initial_center]
+    iterations = 0
 
     j = 2
     while j <= k:
         # Step 2: Select next center using k-means++ stochastic rule with degree constraint
-        next_center = select_stochastic_next_center(G, centers, rng)
+        with profiler.phase("next_center"):
+            next_center = select_stochastic_next_center(G, centers, rng, delay_matrix)
+        profiler.count("distance_lookups", len(delay_matrix) * len(centers))
         if next_center is None:
             print(f"Warning: No eligible center found for k={j}. Stopping at {len(centers)} centers.")
             break
         centers.append(next_center)
         # Step 3: Local K-Means cycle (assignment + center update) until convergence
-        while True:
-            clusters = assign_nodes_to_centers(centers, nodes, path_lengths)
-            new_centers = update_centers(clusters, degrees, avg_degree, path_lengths)
-            if set(new_centers) == set(centers):
-                break
-            centers = new_centers
+        centers, cycle_iterations = local_k_means_cycle(
+            centers, assign, eligible_mask, delay_matrix, profiler, max_iterations
+        )
+        iterations += cycle_iterations
         j += 1
 
-    clusters = assign_nodes_to_centers(centers, nodes, path_lengths)
-    centers, clusters = fix_singleton_clusters(centers, clusters, nodes, path_lengths)
+    with profiler.phase("assignment"):
+        clusters = assign(centers)
+    with profiler.phase("singleton_fix"):
+        centers, clusters = fix_singleton_clusters(centers, clusters, nodes, delay_matrix)
+    if return_iterations:
+        return centers, clusters, iterations
     return centers, clusters
@@ -1,72 +1,100 @@
-import matplotlib.pyplot as plt
-from functools import partial
-from utils.data_utils import *
+# === HDIDS ===
+# High Degree and Independent Dominating Set controller placement
 
-def compute_total_distance(G, node, heuristic):
+from itertools import islice
+
+import networkx as nx
+
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.helpers import assign_nodes_to_centers_vectorized
+from algorithms.instrumentation import NULL_PROFILER
+from algorithms.topology import as_networkx
+
+def compute_total_distance(G, node, delay_matrix=None):
     """
-    Computes the sum of shortest path lengths from a node to all other nodes using A*.
+    Computes the sum of shortest path lengths from a node to all other reachable nodes.
 
-    Parameters:
-        G (nx.Graph): Network graph.
+    Args:
+        G (nx.Graph or Topology): Network graph with delay-weighted edges (attribute "delay_ms").
         node (node): Source node.
-        heuristic (function): Heuristic function for A*.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            A single-source Dijkstra from node is run if not given.
 
     Returns:
-        float: Total shortest path length from node to all other nodes.
+        float: Total shortest path length from node to all other nodes (unreachable nodes are skipped).
     """
-    total = 0.0
-    for target in G.nodes():
-        if node == target:
-            continue
-        try:
-            path_length = nx.astar_path_length(G, node, target, heuristic=heuristic, weight='weight')
-            total += path_length
-        except nx.NetworkXNoPath:
-            pass  # Handle disconnected graphs if necessary
-    return total
-
-
-def hdids(G, k):
+    if delay_matrix is None:
+        lengths = nx.single_source_dijkstra_path_length(as_networkx(G), node, weight='delay_ms')
+        return sum(lengths[target] for target in G.nodes() if target in lengths)
+    return sum(d for d in delay_matrix.row(node).tolist() if d != float('inf'))
+
+
+def hdids(G, k, delay_matrix=None, profiler=None):
     """
     HDIDS algorithm to select k controllers based on high degree and independent dominating set.
 
-    Parameters:
-        G (nx.Graph): Preprocessed network graph.
+    At each step the undominated node (neither a controller nor adjacent to one) with the
+    highest degree becomes a controller; ties are resolved by the minimum total delay to all
+    other nodes. The nodes are scanned once in decreasing degree order and the dominated set
+    grows with every controller, so a step only skips over the nodes dominated since the last one.
+    The selection stops early when every node is dominated.
+
+    Args:
+        G (nx.Graph or Topology): Undirected graph with delay-weighted edges (attribute "delay_ms").
         k (int): Number of controllers to place.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given; pass it to reuse one APSP across many runs.
+        profiler (Profiler, optional): Collects per-phase timings ('delay_matrix', 'selection',
+            'assignment') and counters (see algorithms.instrumentation).
 
     Returns:
-        list: Selected controller nodes.
+        controllers (list): List of selected controller node ids.
+        clusters (dict): Mapping from controller node id to set of assigned node ids
+            (every node is assigned to its closest controller).
     """
-    C = []  # Controller set
-    S = set(G.nodes())
-    heuristic = partial(haversine_heuristic, G=G)
+    profiler = profiler or NULL_PROFILER
+    if delay_matrix is None:
+        with profiler.phase("delay_matrix"):
+            delay_matrix = compute_delay_matrix(G)
 
-    while len(C) < k and S:
-        # Find undominated nodes in S
-        S_prime = [node for node in S
-                   if node not in C and
-                   not any(nbr in C for nbr in G.neighbors(node))]
+    with profiler.phase("selection"):
+        degrees = dict(G.degree())
+        # Stable sort: nodes of equal degree keep the G.nodes() order
+        order = sorted(G.nodes(), key=lambda n: -degrees[n])
+        dominated = set()
+        C = []  # Controller set
+        first = 0  # Position in order of the first node that may be undominated
 
-        if not S_prime:
-            break  # All remaining nodes dominated
+        while len(C) < k:
+            while first < len(order) and order[first] in dominated:
+                first += 1
+            if first == len(order):
+                break  # All remaining nodes dominated
 
-        # Select max degree node in S_prime
-        max_degree = max(G.degree(n) for n in S_prime)
-        candidates = [n for n in S_prime if G.degree(n) == max_degree]
+            # Undominated nodes with the maximum degree
+            max_degree = degrees[order[first]]
+            candidates = []
+            for n in islice(order, first, None):
+                if degrees[n] != max_degree:
+                    break
+                if n not in dominated:
+                    candidates.append(n)
 
-        # Resolve ties using total distance
-        if len(candidates) == 1:
+            # Resolve ties using total distance
             selected = candidates[0]
-        else:
-            min_total = float('inf')
-            selected = None
-            for candidate in candidates:
-                total = compute_total_distance(G, candidate, heuristic)
-                if total < min_total:
-                    min_total = total
-                    selected = candidate
-
-        C.append(selected)
-        S.remove(selected)
-
-    return C
\ No newline at end of file
+            if len(candidates) > 1:
+                min_total = float('inf')
+                for candidate in candidates:
+                    total = compute_total_distance(G, candidate, delay_matrix)
+                    if total < min_total:
+                        min_total = total
+                        selected = candidate
+                profiler.count("distance_lookups", len(candidates) * len(delay_matrix))
+
+            C.append(selected)
+            dominated.add(selected)
+            dominated.update(G.neighbors(selected))
+
+    with profiler.phase("assignment"):
+        clusters = assign_nodes_to_centers_vectorized(C, delay_matrix)
+    return C, clusters
@@ -2,28 +2,44 @@
 # Helper functions for K-Means clustering algorithms
 
 import networkx as nx
+import numpy as np
+
+from algorithms.delay_matrix import LazyDelayMatrix, compute_delay_matrix, sequential_row_sums
+from algorithms.bounded_assignment import clusters_from_labels
+from algorithms.instrumentation import NULL_PROFILER
+from algorithms.topology import Topology, as_networkx
+
+# Default iteration budget of a local K-Means cycle (see local_k_means_cycle)
+LOCAL_CYCLE_MAX_ITERATIONS = 100
+
+# Betweenness source samples used by default with a LazyDelayMatrix (see betweenness_sample_count)
+LAZY_BETWEENNESS_SAMPLES = 100
 
 def compute_path_lengths(G):
     """
     Returns paths computed for the given network using Dijkstra's algorithm.
     Args:
-        G (nx.Graph): Input graph.
+        G (nx.Graph or Topology): Input graph.
 
     Returns:
         path_lengths (dict): Shortest delays path.
     """
-    return dict(nx.all_pairs_dijkstra_path_length(G, weight='delay_ms'))
+    return dict(nx.all_pairs_dijkstra_path_length(as_networkx(G), weight='delay_ms'))
 
 def compute_node_average_degree(G):
     """
     Computes the average degree of nodes in the graph, rounded to the nearest integer.
 
     Args:
-        G (nx.Graph): The input undirected graph with delay-weighted edges.
+        G (nx.Graph or Topology): The input undirected graph with delay-weighted edges.
 
     Returns:
         avg_degree (int): Average degree of nodes in the graph (rounded).
     """
+    if isinstance(G, Topology):
+        # Degree array of the CSR adjacency
+        num_nodes = len(G)
+        return int(round(int(G.degrees.sum()) / num_nodes)) if num_nodes else 0
 
     degrees = dict(G.degree())
     nodes = list(G.nodes())
@@ -37,6 +53,81 @@ def compute_node_average_degree(G):
     return int(round(total_degree_count / num_nodes)) if num_nodes else 0
 
 
+def betweenness_sample_count(G, delay_matrix=None, betweenness_samples=None):
+    """
+    Returns the number of betweenness source samples used by compute_centralities:
+    betweenness_samples if given, LAZY_BETWEENNESS_SAMPLES for a LazyDelayMatrix (exact
+    betweenness grows quadratically with the graph size), None (exact) otherwise or when
+    the count reaches the number of nodes.
+
+    Args:
+        G (nx.Graph or Topology): The input undirected graph.
+        delay_matrix (DelayMatrix or LazyDelayMatrix, optional): Delay matrix of G.
+        betweenness_samples (int, optional): Requested number of samples.
+
+    Returns:
+        int or None: Number of sampled sources, None for the exact betweenness.
+    """
+    if betweenness_samples is None and isinstance(delay_matrix, LazyDelayMatrix):
+        betweenness_samples = LAZY_BETWEENNESS_SAMPLES
+    if betweenness_samples is not None and betweenness_samples >= G.number_of_nodes():
+        return None
+    return betweenness_samples
+
+
+def compute_centralities(G, delay_matrix=None, betweenness_samples=None, seed=None):
+    """
+    Computes the betweenness and closeness centralities used by Enhanced K-Means++.
+    Both only depend on the graph, so they are meant to be computed once per graph
+    and passed to every enhanced_k_means call.
+
+    If a delay matrix is given, closeness is derived from it instead of running Dijkstra
+    from every node again (distances are summed in increasing order, exactly as
+    nx.closeness_centrality does, so the values are identical).
+    The NetworkX centralities of a Topology run on its NetworkX adapter.
+
+    Args:
+        G (nx.Graph or Topology): The input undirected graph with delay-weighted edges.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+        betweenness_samples (int, optional): Number of sampled source nodes for an approximate
+            betweenness (useful for graphs with thousands of nodes). Exact if None, except with
+            a LazyDelayMatrix (see betweenness_sample_count); pass G.number_of_nodes() to force
+            the exact betweenness.
+        seed (int, optional): Seed for the betweenness source sampling.
+
+    Returns:
+        tuple:
+            - betweenness (dict): Mapping {node: normalized betweenness centrality}.
+            - closeness (dict): Mapping {node: closeness centrality}.
+    """
+    betweenness_samples = betweenness_sample_count(G, delay_matrix, betweenness_samples)
+    G = as_networkx(G)
+    betweenness = nx.betweenness_centrality(
+        G, k=betweenness_samples, normalized=True, weight='delay_ms', seed=seed
+    )
+
+    if delay_matrix is None:
+        closeness = nx.closeness_centrality(G, distance='delay_ms')
+        return betweenness, closeness
+
+    n = len(delay_matrix)
+    totals = np.zeros(n)
+    found = np.zeros(n)
+    for idx, block in delay_matrix.iter_row_blocks():
+        distances = np.sort(block, axis=1)
+        reachable = np.isfinite(distances)
+        totals[idx] = sequential_row_sums(np.where(reachable, distances, 0.0))
+        found[idx] = reachable.sum(axis=1) - 1.0
+    values = np.zeros(n)
+    valid = (totals > 0.0) & (n > 1)
+    values[valid] = found[valid] / totals[valid]
+    # Wasserman and Faust improved formula (nx default), scaled by the reachable fraction
+    if n > 1:
+        values[valid] *= found[valid] / (n - 1)
+    closeness = dict(zip(delay_matrix.nodes, values.tolist()))
+    return betweenness, closeness
+
+
 def normalize_metrics(node, degrees, betweenness, closeness):
     """
     Normalizes degree, betweenness, and closeness for a node to [0,1].
@@ -50,6 +141,55 @@ def normalize_metrics(node, degrees, betweenness, closeness):
     return d_norm, b_norm, c_norm
 
 
+def normalize_metric_arrays(nodes, degrees, betweenness, closeness):
+    """
+    Vectorized normalize_metrics: normalizes degree, betweenness and closeness of all
+    nodes to [0,1] at once (each metric divided by its maximum over all nodes).
+
+    Args:
+        nodes (list): Node IDs defining the array order.
+        degrees (dict): Mapping {node: degree}.
+        betweenness (dict): Mapping {node: betweenness centrality}.
+        closeness (dict): Mapping {node: closeness centrality}.
+
+    Returns:
+        np.ndarray: Array of shape (3, n) with normalized degree, betweenness and closeness rows.
+    """
+    metrics = np.array([
+        [degrees[n] for n in nodes],
+        [betweenness[n] for n in nodes],
+        [closeness[n] for n in nodes],
+    ], dtype=float)
+    for row, values in zip(metrics, (degrees, betweenness, closeness)):
+        max_value = max(values.values()) if values else 1
+        if max_value:
+            row /= max_value
+        else:
+            row[:] = 0
+    return metrics
+
+
+def score_initial_centers(normalized, weights):
+    """
+    Scores all nodes for many weight vectors in one array operation.
+    The score is w_degree * d_norm + w_betweenness * b_norm + w_closeness * c_norm,
+    evaluated in the same order as the scalar formula, so the values are bit-identical.
+
+    Args:
+        normalized (np.ndarray): Array of shape (3, n) from normalize_metric_arrays.
+        weights (array-like): Array of shape (W, 3) with rows (w_degree, w_betweenness, w_closeness).
+
+    Returns:
+        np.ndarray: Array of shape (W, n) with the score of every node for every weight vector.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    return (
+        weights[:, 0:1] * normalized[0]
+        + weights[:, 1:2] * normalized[1]
+        + weights[:, 2:3] * normalized[2]
+    )
+
+
 def satisfies_degree(node, degrees, avg_degree):
     """
     Checks whether a node's degree is greater than or equal to the rounded average degree.
@@ -64,7 +204,7 @@ def satisfies_degree(node, degrees, avg_degree):
     """
     return degrees[node] >= avg_degree
 
-def select_farthest_node(nodes, centers, degrees, avg_degree, path_lengths):
+def select_farthest_node(nodes, centers, degrees, avg_degree, delay_matrix):
     """
     Selects the node (not already a center) that is farthest (in terms of minimal
     shortest path distance to any existing center) and satisfies the minimum degree constraint.
@@ -74,33 +214,46 @@ def select_farthest_node(nodes, centers, degrees, avg_degree, path_lengths):
         centers (list): List of already selected center node IDs.
         degrees (dict): Mapping {node: degree}.
         avg_degree (int): Rounded average degree for the network.
-        path_lengths (dict): Nested dict {node: {target: shortest_path_length}}.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
 
     Returns:
         int or None: Node ID of the farthest valid node, or None if none found.
     """
+    center_idx = delay_matrix.indices(centers)
+    min_dists = delay_matrix.min_distances(center_idx)
     farthest_node = None
     max_min_dist = -1
     for n in nodes:
         if n in centers or not satisfies_degree(n, degrees, avg_degree):
             continue
-        min_dist = min(path_lengths[n][c] for c in centers)
+        min_dist = min_dists[delay_matrix.index[n]]
         if min_dist > max_min_dist:
             max_min_dist = min_dist
             farthest_node = n
     return farthest_node
 
 
-def select_stochastic_next_center(G, centers, rng):
+def select_stochastic_next_center(G, centers, rng, delay_matrix=None):
     """
     Samples a new center among nodes not in centers (prefer degree >= avg_degree)
     with probability proportional to squared min distance to any center.
+
+    Args:
+        G (nx.Graph): The input undirected graph with delay-weighted edges.
+        centers (list): List of already selected center node IDs.
+        rng (random.Random): Random number generator for stochastic sampling.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
+
+    Returns:
+        int or None: Node ID of the sampled center, or None if no node is left.
     """
     nodes = list(G.nodes())
     degrees = dict(G.degree())
     avg_degree = compute_node_average_degree(G)
 
-    path_lengths = compute_path_lengths(G)
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
 
     candidates = [n for n in nodes if n not in centers and satisfies_degree(n, degrees, avg_degree)]
     if not candidates:
@@ -108,10 +261,10 @@ def select_stochastic_next_center(G, centers, rng):
         candidates = [n for n in nodes if n not in centers]
         if not candidates:
             return None
-    dists = []
-    for n in candidates:
-        min_dist = min(path_lengths[n][c] for c in centers)
-        dists.append(min_dist ** 2)
+    center_idx = delay_matrix.indices(centers)
+    candidate_idx = delay_matrix.indices(candidates)
+    min_dists = delay_matrix.min_distances(center_idx)[candidate_idx].tolist()
+    dists = [min_dist ** 2 for min_dist in min_dists]
     total = sum(dists)
     if total == 0:
         return rng.choice(candidates)
@@ -119,59 +272,235 @@ def select_stochastic_next_center(G, centers, rng):
     return candidates[chosen_idx]
 
 
-def assign_nodes_to_centers(centers, nodes, path_lengths):
+def assign_nodes_to_centers(centers, nodes, delay_matrix):
     """
     Assigns each node in the graph to the closest center (controller) based on shortest path length.
+    Every center is assigned to its own cluster, so no cluster is ever empty.
 
     Args:
         centers (list): List of center node IDs.
         nodes (list): List of all node IDs in the graph.
-        path_lengths (dict): Nested dict {node: {target: shortest_path_length}}.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
 
     Returns:
         dict: Mapping {center_node: set of assigned node IDs}.
     """
     clusters = {c: set() for c in centers}
+    center_idx = delay_matrix.indices(centers)
     for n in nodes:
-        closest_center = min(centers, key=lambda c: path_lengths[n][c])
-        clusters[closest_center].add(n)
+        if n in clusters:
+            # A center always belongs to its own cluster
+            clusters[n].add(n)
+            continue
+        row = delay_matrix.matrix[delay_matrix.index[n], center_idx]
+        closest_center = min(range(len(centers)), key=lambda j: row[j])
+        clusters[centers[closest_center]].add(n)
     return clusters
 
 
-def update_centers(clusters, degrees, avg_degree, path_lengths):
+def update_centers(clusters, degrees, avg_degree, delay_matrix):
     """
     For each cluster, selects as center the node with the minimal sum of delays to all
     other nodes in the cluster, preferring nodes with degree >= avg_degree.
     Falls back to any node in the cluster if no eligible candidates exist.
+    An empty cluster keeps its center, so the number of centers never changes.
 
     Args:
         clusters (dict): Mapping {center_node: set of nodes in the cluster}.
         degrees (dict): Mapping {node: degree}.
         avg_degree (int): Rounded average degree for the network.
-        path_lengths (dict): Nested dict {node: {target: shortest_path_length}}.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
 
     Returns:
         list: List of node IDs to be used as updated centers for each cluster (order matches clusters.values()).
     """
     new_centers = []
-    for members in clusters.values():
+    for center, members in clusters.items():
         if not members:
-            print("[WARN] Empty cluster detected during update_centers, skipping.")
+            # Keeping the center preserves the number of clusters
+            print("[WARN] Empty cluster detected during update_centers, keeping its center.")
+            new_centers.append(center)
             continue
         eligible = [n for n in members if satisfies_degree(n, degrees, avg_degree)]
         if not eligible:
             eligible = list(members)
+        member_idx = delay_matrix.indices(members)
         best = None
         min_sum = float('inf')
         for n in eligible:
-            s = sum(path_lengths[n][m] for m in members)
+            s = sum(delay_matrix.matrix[delay_matrix.index[n], member_idx].tolist())
             if s < min_sum:
                 min_sum = s
                 best = n
         new_centers.append(best)
     return new_centers
 
-def fix_singleton_clusters(centers, clusters, nodes, path_lengths):
+def degree_eligibility_mask(delay_matrix, degrees, avg_degree):
+    """
+    Builds the degree-eligibility mask used by the vectorized kernels.
+
+    Args:
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+        degrees (dict): Mapping {node: degree}.
+        avg_degree (int): Rounded average degree for the network.
+
+    Returns:
+        np.ndarray: Boolean array (matrix order), True where satisfies_degree holds.
+    """
+    return np.array([satisfies_degree(n, degrees, avg_degree) for n in delay_matrix.nodes], dtype=bool)
+
+
+def assign_labels(center_idx, delay_matrix):
+    """
+    Vectorized assignment step: for every node, the position (in center_idx) of its closest center.
+    Ties are resolved in favour of the center listed first, as in assign_nodes_to_centers; every
+    center is assigned to itself, even when another center is equally close (zero-delay links).
+
+    Args:
+        center_idx (np.ndarray): Matrix indices of the centers.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Returns:
+        np.ndarray: Integer array (matrix order) of center positions.
+    """
+    labels = delay_matrix.nearest(center_idx)
+    labels[center_idx] = np.arange(len(center_idx))
+    return labels
+
+
+def assign_nodes_to_centers_vectorized(centers, delay_matrix):
+    """
+    Array-based version of assign_nodes_to_centers operating on the whole delay matrix.
+
+    Args:
+        centers (list): List of center node IDs.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Returns:
+        dict: Mapping {center_node: set of assigned node IDs}.
+    """
+    labels = assign_labels(delay_matrix.indices(centers), delay_matrix)
+    return clusters_from_labels(centers, labels, delay_matrix)
+
+
+def make_assign_fn(delay_matrix, assigner=None):
+    """
+    Returns the assignment step used by the local K-Means cycle.
+
+    Args:
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+        assigner (BoundedAssigner, optional): Bounded assignment (see algorithms.bounded_assignment);
+            plain assign_nodes_to_centers_vectorized if None.
+
+    Returns:
+        callable: Function mapping a list of centers to {center_node: set of assigned node IDs}.
+    """
+    if assigner is not None:
+        return assigner.assign
+    return lambda centers: assign_nodes_to_centers_vectorized(centers, delay_matrix)
+
+
+def update_centers_vectorized(clusters, eligible_mask, delay_matrix):
+    """
+    Array-based version of update_centers: for each cluster the medoid is found with
+    a masked row sum over the cluster's delay sub-matrix (see DelayMatrix.medoid).
+    Members are visited in the same order as in update_centers, so ties are resolved identically.
+
+    Args:
+        clusters (dict): Mapping {center_node: set of nodes in the cluster}.
+        eligible_mask (np.ndarray): Boolean degree-eligibility mask (see degree_eligibility_mask).
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Returns:
+        list: List of node IDs to be used as updated centers for each cluster (order matches clusters.values()).
+    """
+    new_centers = []
+    for center, members in clusters.items():
+        if not members:
+            # Keeping the center preserves the number of clusters
+            print("[WARN] Empty cluster detected during update_centers, keeping its center.")
+            new_centers.append(center)
+            continue
+        member_idx = delay_matrix.indices(members)
+        eligible_idx = member_idx[eligible_mask[member_idx]]
+        if not len(eligible_idx):
+            eligible_idx = member_idx
+        best = delay_matrix.medoid(eligible_idx, member_idx, start=delay_matrix.index[center])
+        new_centers.append(delay_matrix.nodes[eligible_idx[best]])
+    return new_centers
+
+
+def local_k_means_cycle(
+    centers,
+    assign,
+    eligible_mask,
+    delay_matrix,
+    profiler=NULL_PROFILER,
+    max_iterations=LOCAL_CYCLE_MAX_ITERATIONS
+):
+    """
+    Local K-Means cycle shared by the K-Means algorithms: assignment and medoid update are
+    repeated until the set of centers no longer changes.
+
+    The degree-constrained medoid update does not always decrease the total delay, so the cycle
+    may oscillate between center sets. Every visited set is remembered (as a frozenset); when
+    the update leads back to an earlier one, the cycle stops and returns the set of the loop
+    with the smallest total delay (the first one on ties). The cycle also stops after
+    max_iterations passes, with the centers of the last update.
+
+    Args:
+        centers (list): Current center node IDs.
+        assign (callable): Assignment step (see make_assign_fn).
+        eligible_mask (np.ndarray): Boolean degree-eligibility mask (see degree_eligibility_mask).
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+        profiler (Profiler, optional): Collects the 'assignment' and 'medoid_update' timings and
+            the cycle counters (see algorithms.instrumentation).
+        max_iterations (int): Maximum number of passes (assignment + medoid update).
+
+    Returns:
+        tuple: (centers, iterations), the final center node IDs and the number of passes.
+    """
+    previous_labels = None
+    history = [list(centers)]
+    visited = {frozenset(centers): 0}
+    iterations = 0
+    while True:
+        with profiler.phase("assignment"):
+            clusters = assign(centers)
+        with profiler.phase("medoid_update"):
+            new_centers = update_centers_vectorized(clusters, eligible_mask, delay_matrix)
+        iterations += 1
+        profiler.count("local_cycle_iterations")
+        if profiler.enabled:
+            labels = {n: c for c, members in clusters.items() for n in members}
+            if previous_labels is not None:
+                profiler.count("nodes_reassigned", sum(labels[n] != previous_labels[n] for n in labels))
+            previous_labels = labels
+            lookups = len(delay_matrix) * len(centers)
+            for members in clusters.values():
+                member_idx = delay_matrix.indices(members)
+                lookups += len(member_idx) * (int(eligible_mask[member_idx].sum()) or len(member_idx))
+            profiler.count("distance_lookups", lookups)
+
+        key = frozenset(new_centers)
+        if key == frozenset(centers):
+            return centers, iterations
+        if key in visited:
+            loop = history[visited[key]:]
+            costs = [delay_matrix.min_distances(delay_matrix.indices(c)).sum() for c in loop]
+            profiler.count("oscillations")
+            print(f"[WARN] Local K-Means cycle oscillates between {len(loop)} center sets, "
+                  f"stopping after {iterations} iterations.")
+            return loop[int(np.argmin(costs))], iterations
+        if iterations >= max_iterations:
+            profiler.count("iteration_budget_exhausted")
+            print(f"[WARN] Local K-Means cycle did not converge in {max_iterations} iterations.")
+            return new_centers, iterations
+        visited[key] = len(history)
+        history.append(new_centers)
+        centers = new_centers
+
+def fix_singleton_clusters(centers, clusters, nodes, delay_matrix):
     """
     Ensures that no cluster consists of only a single node (the controller itself).
     If such clusters are found, removes their centers and reassigns the node to the nearest remaining center.
@@ -180,7 +509,7 @@ def fix_singleton_clusters(centers, clusters, nodes, path_lengths):
         centers (list): List of center node IDs.
         clusters (dict): Mapping {center_node: set of assigned node IDs}.
         nodes (list): List of all node IDs in the graph.
-        path_lengths (dict): Nested dict {node: {target: shortest_path_length}}.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
 
     Returns:
         (new_centers, new_clusters): Tuple with updated lists/dicts after removing singletons.
@@ -198,7 +527,7 @@ def fix_singleton_clusters(centers, clusters, nodes, path_lengths):
         if not candidates:
             continue  # nothing to do, all are singleton
         # Assign the singleton node to the nearest center
-        closest = min(candidates, key=lambda c: path_lengths[single][c])
+        closest = min(candidates, key=lambda c: delay_matrix.distance(single, c))
         clusters[closest].add(single)
     # Remove singleton centers' cluster
     new_clusters = {c: members for c, members in clusters.items() if c not in singleton_centers}
@@ -0,0 +1,106 @@
+# === Instrumentation ===
+# Optional per-phase timers and counters of the clustering algorithms
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    """
+    Collects the wall time spent in each phase of a run and named counters.
+
+    The algorithms take an optional profiler= argument and wrap their phases
+    ('delay_matrix', 'centralities', 'initial_center', 'next_center', 'assignment',
+    'medoid_update', 'singleton_fix') in profiler.phase(name). Without a profiler they use
+    NULL_PROFILER, whose phases are a shared no-op context and whose counters are ignored.
+
+    Counters:
+        local_cycle_iterations: Passes (assignment + medoid update) of the local K-Means cycles.
+        nodes_reassigned: Nodes whose center changed between two passes of a local cycle.
+        distance_lookups: Node-center (and medoid candidate-member) delays read by the
+            assignment, medoid update and next-center steps.
+        oscillations: Local cycles stopped because they returned to an earlier center set.
+        iteration_budget_exhausted: Local cycles stopped by their iteration budget.
+        assignment_pruned: Node-center comparisons skipped by the bounded assignment
+            (see algorithms.bounded_assignment).
+
+    Attributes:
+        enabled (bool): True (False for NULL_PROFILER); guards counters that cost work to compute.
+        timings (dict): {phase: total seconds}.
+        calls (dict): {phase: number of times the phase was entered}.
+        counters (dict): {counter: value}.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clears all timings and counters."""
+        self.timings = {}
+        self.calls = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time spent in its block to the phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, value=1):
+        """
+        Adds value to the counter name.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: {'timings_s': {...}, 'calls': {...}, 'counters': {...}} (JSON-serializable).
+        """
+        return {
+            "timings_s": dict(self.timings),
+            "calls": dict(self.calls),
+            "counters": {name: int(value) for name, value in self.counters.items()},
+        }
+
+    def snapshot(self):
+        """
+        Returns to_dict() and resets the profiler (e.g. between the k steps of a sweep).
+        """
+        profile = self.to_dict()
+        self.reset()
+        return profile
+
+    def save_json(self, path):
+        """
+        Writes to_dict() to a JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class _NullProfiler:
+    """
+    Profiler interface doing nothing, used when no profiler is given.
+    """
+
+    enabled = False
+    _context = nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,166 @@
+# === Swap K-Medoids ===
+# FastPAM-style swap refinement of controller placements (starting from Advanced K-Means)
+
+import numpy as np
+
+from algorithms.helpers import (
+    degree_eligibility_mask,
+    assign_nodes_to_centers_vectorized,
+    compute_node_average_degree
+)
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.advanced_k_means import advanced_k_means_sweep
+
+# Number of candidate columns evaluated at once (bounds the n x block temporary arrays)
+CANDIDATE_BLOCK = 256
+
+
+def _nearest_two(medoid_idx, delay_matrix):
+    """
+    Returns, for every node, the position of its nearest medoid, the distance to it
+    and the distance to the second nearest medoid (np.inf if there is only one medoid).
+    """
+    dists = delay_matrix.columns(medoid_idx)
+    order = np.argsort(dists, axis=1, kind="stable")
+    rows = np.arange(dists.shape[0])
+    nearest = order[:, 0]
+    d_nearest = dists[rows, nearest]
+    if len(medoid_idx) > 1:
+        d_second = dists[rows, order[:, 1]]
+    else:
+        d_second = np.full(dists.shape[0], np.inf)
+    return nearest, d_nearest, d_second
+
+
+def best_swap(medoid_idx, candidate_idx, delay_matrix):
+    """
+    Finds the (medoid, candidate) swap with the largest decrease of the total delay
+    between nodes and their nearest medoid.
+
+    Uses the FastPAM1 decomposition: with cached nearest / second nearest distances the
+    change of every medoid removal for one candidate is accumulated in a single O(n) pass
+    (nodes are sorted by nearest medoid, so each medoid sums one contiguous run of nodes),
+    instead of O(k n) for each (medoid, candidate) pair. Candidates are evaluated in blocks.
+
+    Args:
+        medoid_idx (np.ndarray): Matrix indices of the current medoids.
+        candidate_idx (np.ndarray): Matrix indices of the nodes allowed to become medoids.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Returns:
+        tuple: (delta, medoid position, candidate matrix index) of the best swap;
+            delta is the change of the total delay (negative = improvement).
+    """
+    k = len(medoid_idx)
+    nearest, d_nearest, d_second = _nearest_two(medoid_idx, delay_matrix)
+    # Nodes sorted by nearest medoid: the nodes of each medoid are then a contiguous run of rows
+    order = np.argsort(nearest, kind="stable")
+    bounds = np.cumsum(np.bincount(nearest, minlength=k)).tolist()
+    runs = list(zip([0] + bounds[:-1], bounds))
+    d_nearest, d_second = d_nearest[order], d_second[order]
+
+    if k > 1:
+        # Loss of removing each medoid without replacement: its nodes move to their second nearest
+        removal_loss = np.array([(d_second[a:b] - d_nearest[a:b]).sum() for a, b in runs])
+
+    best = (0.0, None, None)
+    for start in range(0, len(candidate_idx), CANDIDATE_BLOCK):
+        block = candidate_idx[start:start + CANDIDATE_BLOCK]
+        d_cand = delay_matrix.columns(block, order)
+        if k > 1:
+            closer = d_cand < d_nearest[:, None]
+            # Nodes closer to the candidate move to it whichever medoid is removed
+            shared = np.where(closer, d_cand - d_nearest[:, None], 0.0).sum(axis=0)
+            # Per removed medoid: its nodes go to the candidate or their second nearest medoid;
+            # nodes already counted in shared must not pay the removal loss
+            own = np.where(
+                closer,
+                (d_nearest - d_second)[:, None],
+                np.minimum(d_cand - d_second[:, None], 0.0)
+            )
+            own_per_medoid = np.array([own[a:b].sum(axis=0) for a, b in runs])
+            deltas = removal_loss[:, None] + own_per_medoid + shared
+        else:
+            # Single medoid: every node moves to the candidate
+            deltas = (d_cand.sum(axis=0) - d_nearest.sum())[None, :]
+
+        pos, col = np.unravel_index(np.argmin(deltas), deltas.shape)
+        if deltas[pos, col] < best[0]:
+            best = (float(deltas[pos, col]), int(pos), int(block[col]))
+    return best
+
+
+def swap_k_medoids(G, k, delay_matrix=None, initial_centers=None, max_swaps=None):
+    """
+    Swap-based k-medoids (FastPAM-style) for SDN controller placement.
+
+    Starting from the Advanced K-Means placement, repeatedly applies the (controller, node) swap
+    that most reduces the total delay between switches and their nearest controller, until no
+    swap improves it. Since controllers have zero delay to themselves, this directly minimizes
+    the average controller latency. Only nodes satisfying the degree constraint
+    (degree >= rounded average degree) can become controllers, as in Advanced K-Means.
+
+    Args:
+        G (nx.Graph): Undirected graph with delay-weighted edges (attribute "delay_ms").
+        k (int): Number of controllers (clusters).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+            Computed from G if not given.
+        initial_centers (list, optional): Starting controllers (default: advanced_k_means(G, k)).
+        max_swaps (int, optional): Maximum number of swaps (unbounded if None).
+
+    Returns:
+        controllers (list): List of selected controller node ids.
+        clusters (dict): Mapping from controller node id to set of assigned node ids.
+    """
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
+    if initial_centers is None:
+        for _, initial_centers, _, _ in advanced_k_means_sweep(G, max(k, 1), delay_matrix):
+            pass
+
+    degrees = dict(G.degree())
+    avg_degree = compute_node_average_degree(G)
+    eligible_mask = degree_eligibility_mask(delay_matrix, degrees, avg_degree)
+    if not eligible_mask.any():
+        eligible_mask[:] = True
+
+    medoid_idx = delay_matrix.indices(initial_centers)
+    # Ignore improvements below floating point noise to guarantee termination
+    tolerance = 1e-12 * max(1.0, float(delay_matrix.min_distances(medoid_idx).sum()))
+
+    swaps = 0
+    while max_swaps is None or swaps < max_swaps:
+        is_medoid = np.zeros(len(delay_matrix), dtype=bool)
+        is_medoid[medoid_idx] = True
+        candidate_idx = np.flatnonzero(eligible_mask & ~is_medoid)
+        if not len(candidate_idx):
+            break
+        delta, pos, candidate = best_swap(medoid_idx, candidate_idx, delay_matrix)
+        if pos is None or delta >= -tolerance:
+            break
+        medoid_idx[pos] = candidate
+        swaps += 1
+
+    centers = [delay_matrix.nodes[i] for i in medoid_idx]
+    clusters = assign_nodes_to_centers_vectorized(centers, delay_matrix)
+    return centers, clusters
+
+
+def swap_k_medoids_sweep(G, kmax, delay_matrix=None, max_swaps=None):
+    """
+    Runs swap_k_medoids for k = 1..kmax, refining every solution of one
+    advanced_k_means_sweep pass (instead of rerunning Advanced K-Means for every k).
+
+    Args:
+        G (nx.Graph): Undirected graph with delay-weighted edges (attribute "delay_ms").
+        kmax (int): Maximum number of controllers (clusters).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+        max_swaps (int, optional): Maximum number of swaps per k (unbounded if None).
+
+    Yields:
+        tuple: (k, controllers, clusters) for k = 1..kmax.
+    """
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
+    for k, centers, _, _ in advanced_k_means_sweep(G, kmax, delay_matrix):
+        yield (k, *swap_k_medoids(G, k, delay_matrix, centers, max_swaps))
@@ -0,0 +1,292 @@
+# === Topology ===
+# Compact, immutable array-backed topology (CSR adjacency) with a NetworkX adapter
+
+import math
+
+import networkx as nx
+import numpy as np
+
+# Edge attribute names accepted by Topology.edge_values
+DELAY_ATTRIBUTES = ('delay_ms', 'weight')
+DISTANCE_ATTRIBUTE = 'dist'
+
+
+class Topology:
+    """
+    Undirected topology stored as NumPy arrays: node attributes and a CSR adjacency (both
+    directions of every edge) with the delay and the length of each entry.
+
+    All arrays are read-only, so one instance can be shared by every k, run and worker process
+    without copies; it pickles as a handful of arrays instead of NetworkX's dict-of-dicts.
+    It provides the read-only part of the nx.Graph interface used by the algorithms (nodes(),
+    nodes[n], degree(), neighbors(), edges(), number_of_nodes(), ...); to_networkx() returns an
+    equivalent nx.Graph for everything else (e.g. the NetworkX centralities). Self-loops are
+    dropped and for parallel edges only the shortest one is kept.
+
+    Attributes:
+        name (str): Topology name (also available as graph['name']).
+        ids (list): Node IDs in index order.
+        index (dict): Mapping {node: index}.
+        label (np.ndarray): Node labels (str).
+        lat (np.ndarray): Node latitudes in degrees (NaN if unknown).
+        lon (np.ndarray): Node longitudes in degrees (NaN if unknown).
+        degrees (np.ndarray): Node degrees.
+        indptr (np.ndarray): CSR row pointers, shape (n + 1,).
+        indices (np.ndarray): CSR neighbor indices, shape (2 * edges,).
+        delay (np.ndarray): Propagation delay (ms) of every CSR entry.
+        dist (np.ndarray): Length (km) of every CSR entry (NaN if unknown).
+    """
+
+    def __init__(self, ids, indptr, indices, delay, dist=None, label=None, lat=None, lon=None, name=""):
+        """
+        Args:
+            ids (list): Node IDs in index order.
+            indptr, indices (np.ndarray): CSR adjacency, symmetric, without duplicate entries.
+            delay (np.ndarray): Delay (ms) of every CSR entry.
+            dist (np.ndarray, optional): Length (km) of every CSR entry.
+            label, lat, lon (np.ndarray, optional): Node attributes in index order.
+            name (str): Topology name.
+        """
+        n = len(ids)
+        self.name = str(name)
+        self.ids = list(ids)
+        self.index = {node: i for i, node in enumerate(self.ids)}
+        self.indptr = _read_only(indptr)
+        self.indices = _read_only(indices)
+        self.delay = _read_only(np.asarray(delay, dtype=float))
+        self.dist = _read_only(np.full(len(self.indices), np.nan) if dist is None else np.asarray(dist, dtype=float))
+        self.label = _read_only(np.array([str(i) for i in self.ids]) if label is None else np.asarray(label, dtype=str))
+        self.lat = _read_only(np.full(n, np.nan) if lat is None else np.asarray(lat, dtype=float))
+        self.lon = _read_only(np.full(n, np.nan) if lon is None else np.asarray(lon, dtype=float))
+        self.degrees = _read_only(np.diff(self.indptr))
+        self.nodes = _NodeView(self)
+        self._networkx = None
+
+    @classmethod
+    def from_edges(cls, ids, source, target, delay, dist=None, label=None, lat=None, lon=None, name=""):
+        """
+        Builds a topology from an edge list (each undirected edge listed once).
+
+        Args:
+            ids (list): Node IDs.
+            source, target (array-like): Node IDs of the edge endpoints.
+            delay (array-like): Delay (ms) of every edge.
+            dist (array-like, optional): Length (km) of every edge.
+            label, lat, lon (array-like, optional): Node attributes in the order of ids.
+            name (str): Topology name.
+
+        Returns:
+            Topology
+        """
+        ids = list(ids)
+        n = len(ids)
+        index = {node: i for i, node in enumerate(ids)}
+        src = np.fromiter((index[u] for u in source), dtype=np.intp, count=len(source))
+        dst = np.fromiter((index[v] for v in target), dtype=np.intp, count=len(target))
+        delay = np.asarray(delay, dtype=float)
+        dist = np.full(len(src), np.nan) if dist is None else np.asarray(dist, dtype=float)
+
+        keep = src != dst
+        rows = np.concatenate([src[keep], dst[keep]])
+        cols = np.concatenate([dst[keep], src[keep]])
+        delay = np.concatenate([delay[keep], delay[keep]])
+        dist = np.concatenate([dist[keep], dist[keep]])
+
+        # Sort by (row, column, delay) and keep the shortest of parallel edges
+        order = np.lexsort((delay, cols, rows))
+        rows, cols, delay, dist = rows[order], cols[order], delay[order], dist[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, delay, dist = rows[first], cols[first], delay[first], dist[first]
+
+        index_dtype = np.int32 if len(rows) < 2**31 else np.int64
+        indptr = np.zeros(n + 1, dtype=index_dtype)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(ids, indptr, cols.astype(index_dtype), delay, dist, label, lat, lon, name)
+
+    @classmethod
+    def from_networkx(cls, G, weight='delay_ms'):
+        """
+        Builds a topology from a graph as returned by load_gml_to_delay_graph.
+
+        Args:
+            G (nx.Graph): Graph with delay-weighted edges.
+            weight (str): Edge attribute used as the delay.
+
+        Returns:
+            Topology
+        """
+        ids = list(G.nodes())
+        edges = list(G.edges(data=True))
+        return cls.from_edges(
+            ids,
+            [u for u, _, _ in edges],
+            [v for _, v, _ in edges],
+            [data[weight] for _, _, data in edges],
+            [float(data.get(DISTANCE_ATTRIBUTE, np.nan)) for _, _, data in edges],
+            label=[str(G.nodes[n].get('label', n)) for n in ids],
+            lat=[float(G.nodes[n].get('lat', np.nan)) for n in ids],
+            lon=[float(G.nodes[n].get('lon', np.nan)) for n in ids],
+            name=G.graph.get('name', ''),
+        )
+
+    def to_networkx(self):
+        """
+        Returns the topology as a frozen nx.Graph with the attributes of load_gml_to_delay_graph
+        ('label', 'lat', 'lon' on nodes; 'dist', 'delay_ms' and 'weight' on edges).
+        It is built on the first call and reused.
+        """
+        if self._networkx is None:
+            G = nx.Graph(name=self.name)
+            G.add_nodes_from(self.nodes(data=True))
+            G.add_edges_from(self.edges(data=True))
+            self._networkx = nx.freeze(G)
+        return self._networkx
+
+    def __getstate__(self):
+        # Only the arrays are pickled; the index, views and the NetworkX adapter are rebuilt
+        ids = self.ids
+        if all(type(node) is int for node in ids):
+            ids = np.array(ids, dtype=np.int64)
+        return {
+            'ids': ids, 'indptr': self.indptr, 'indices': self.indices, 'delay': self.delay,
+            'dist': self.dist, 'label': self.label, 'lat': self.lat, 'lon': self.lon, 'name': self.name,
+        }
+
+    def __setstate__(self, state):
+        if isinstance(state['ids'], np.ndarray):
+            state['ids'] = state['ids'].tolist()
+        self.__init__(**state)
+
+    @property
+    def graph(self):
+        return {'name': self.name}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def number_of_nodes(self):
+        return len(self.ids)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def is_directed(self):
+        return False
+
+    def is_multigraph(self):
+        return False
+
+    def degree(self, node=None):
+        """
+        Returns the degree of node, or (node, degree) pairs of all nodes if node is None
+        (so dict(G.degree()) works as for nx.Graph).
+        """
+        if node is not None:
+            return int(self.degrees[self.index[node]])
+        return list(zip(self.ids, self.degrees.tolist()))
+
+    def neighbor_indices(self, i):
+        """
+        Returns the indices of the neighbors of the node at index i.
+        """
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def neighbors(self, node):
+        """
+        Returns an iterator over the neighbors of node.
+        """
+        ids = self.ids
+        return (ids[j] for j in self.neighbor_indices(self.index[node]).tolist())
+
+    def edge_values(self, weight='delay_ms'):
+        """
+        Returns the CSR entry values of an edge attribute ('delay_ms', 'weight' or 'dist').
+        """
+        if weight in DELAY_ATTRIBUTES:
+            return self.delay
+        if weight == DISTANCE_ATTRIBUTE:
+            return self.dist
+        raise ValueError(f"Unknown edge attribute: {weight}")
+
+    def edges(self, data=False):
+        """
+        Lists every edge once as (u, v), (u, v, value of attribute data) or (u, v, attribute dict)
+        if data is True.
+        """
+        rows = np.repeat(np.arange(len(self.ids)), self.degrees)
+        once = rows < self.indices
+        ids = self.ids
+        pairs = [(ids[i], ids[j]) for i, j in zip(rows[once].tolist(), self.indices[once].tolist())]
+        if data is False:
+            return pairs
+        if data is True:
+            return [
+                (u, v, _edge_attributes(delay, dist))
+                for (u, v), delay, dist in zip(pairs, self.delay[once].tolist(), self.dist[once].tolist())
+            ]
+        return [(u, v, value) for (u, v), value in zip(pairs, self.edge_values(data)[once].tolist())]
+
+    def node_attributes(self, node):
+        """
+        Returns the attribute dict of node ('label', and 'lat'/'lon' when known).
+        """
+        i = self.index[node]
+        attrs = {'label': str(self.label[i])}
+        if not math.isnan(self.lat[i]):
+            attrs['lat'] = float(self.lat[i])
+        if not math.isnan(self.lon[i]):
+            attrs['lon'] = float(self.lon[i])
+        return attrs
+
+
+class _NodeView:
+    # Minimal counterpart of nx's NodeView: G.nodes() lists the nodes, G.nodes[n] is the attribute dict
+
+    def __init__(self, topology):
+        self._topology = topology
+
+    def __call__(self, data=False):
+        if data:
+            return [(n, self._topology.node_attributes(n)) for n in self._topology.ids]
+        return list(self._topology.ids)
+
+    def __getitem__(self, node):
+        return self._topology.node_attributes(node)
+
+    def __iter__(self):
+        return iter(self._topology.ids)
+
+    def __len__(self):
+        return len(self._topology.ids)
+
+    def __contains__(self, node):
+        return node in self._topology.index
+
+
+def _read_only(array):
+    array = np.asarray(array)
+    array.setflags(write=False)
+    return array
+
+
+def _edge_attributes(delay, dist):
+    attrs = {'delay_ms': delay, 'weight': delay}
+    if not math.isnan(dist):
+        attrs[DISTANCE_ATTRIBUTE] = dist
+    return attrs
+
+
+def as_networkx(G):
+    """
+    Returns G itself for an nx.Graph, its NetworkX adapter (Topology.to_networkx) for a Topology.
+    """
+    if isinstance(G, Topology):
+        return G.to_networkx()
+    return G
@@ -0,0 +1,86 @@
+import os
+import glob
+import time
+import argparse
+
+import networkx as nx
+
+from algorithms.delay_matrix import compute_delay_matrix, csgraph_dijkstra
+from utils.data_utils import load_gml_to_delay_graph
+
+
+def largest_topology(topology_dir="topologies", propagation_speed_km_per_ms=204):
+    """
+    Finds the GML topology with the most nodes.
+
+    Args:
+        topology_dir (str): Directory with the GML files.
+        propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms.
+
+    Returns:
+        tuple: (path of the GML file, graph loaded with load_gml_to_delay_graph).
+    """
+    graphs = {
+        path: load_gml_to_delay_graph(path, propagation_speed_km_per_ms)
+        for path in sorted(glob.glob(os.path.join(topology_dir, "*.gml")))
+    }
+    path = max(graphs, key=lambda p: graphs[p].number_of_nodes())
+    return path, graphs[path]
+
+
+def benchmark_apsp(G, repeats=5, workers=None):
+    """
+    Times the all-pairs shortest path builders on one graph: the nested dict of
+    nx.all_pairs_dijkstra_path_length (the original compute_path_lengths), compute_delay_matrix
+    with the NetworkX and SciPy backends, and compute_delay_matrix on a process pool.
+
+    Args:
+        G (nx.Graph): Graph with delay-weighted edges (attribute "delay_ms").
+        repeats (int): Number of timed runs of each builder (the best one is reported).
+        workers (int, optional): Worker processes of the parallel builder (default: all CPU cores).
+
+    Returns:
+        dict: {builder name: best wall time in seconds}.
+    """
+    workers = workers or os.cpu_count() or 1
+    backend = "networkx" if csgraph_dijkstra is None else "scipy"
+    builders = {
+        "networkx_all_pairs_dict": lambda: dict(nx.all_pairs_dijkstra_path_length(G, weight="delay_ms")),
+        "delay_matrix_networkx": lambda: compute_delay_matrix(G, backend="networkx"),
+        "delay_matrix_scipy": lambda: compute_delay_matrix(G, backend="scipy"),
+        f"delay_matrix_{backend}_{workers}_workers": lambda: compute_delay_matrix(
+            G, workers=workers, backend=backend
+        ),
+    }
+    if csgraph_dijkstra is None:
+        del builders["delay_matrix_scipy"]
+
+    timings = {}
+    for name, build in builders.items():
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            build()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="All-pairs shortest path builders benchmark.")
+    parser.add_argument("--gml", help="GML topology (default: largest file in topologies/)")
+    parser.add_argument("--speed", type=float, default=204, help="Propagation speed in km/ms")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.gml:
+        gml_file, G = args.gml, load_gml_to_delay_graph(args.gml, args.speed)
+    else:
+        gml_file, G = largest_topology(propagation_speed_km_per_ms=args.speed)
+
+    timings = benchmark_apsp(G, args.repeats, args.workers)
+    baseline = timings["networkx_all_pairs_dict"]
+    print(f"{gml_file}: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    for name, seconds in timings.items():
+        print(f"{name:<40} {seconds * 1000:10.3f} ms  x{baseline / seconds:6.2f}")
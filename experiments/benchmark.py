@@ -0,0 +1,286 @@
+import os
+import gc
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+import numpy as np
+import networkx as nx
+
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.advanced_k_means import advanced_k_means
+from algorithms.enhanced_k_means import enhanced_k_means
+from algorithms.hdids import hdids
+from algorithms.helpers import compute_centralities, assign_nodes_to_centers_vectorized
+from utils.data_utils import load_gml_to_delay_graph, add_delay_attributes
+from utils.topology_generator import generate_wan_topology
+from utils.experiment_utils import compute_latencies_for_experiment
+
+# Default location of the benchmark results (one JSON file per run of the suite)
+BENCHMARK_DIR = "results/benchmarks"
+
+# Metrics compared by compare_benchmarks
+COMPARED_METRICS = ("wall_time_s", "peak_memory_mb")
+
+
+class CountingAssigner:
+    """
+    Plain vectorized assignment step that counts its calls, passed as assigner= to the
+    K-Means functions: every pass of the local K-Means cycle performs one assignment, so
+    the count is the number of iterations of the run.
+
+    Attributes:
+        calls (int): Number of assignment passes.
+    """
+
+    def __init__(self, delay_matrix):
+        self.delay_matrix = delay_matrix
+        self.calls = 0
+
+    def assign(self, centers):
+        self.calls += 1
+        return assign_nodes_to_centers_vectorized(centers, self.delay_matrix)
+
+
+def git_commit():
+    """
+    Returns:
+        str or None: Hash of the checked out commit (None outside a git repository).
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeats=1):
+    """
+    Runs fn repeats times for the wall time, then once more under tracemalloc for the peak memory
+    (tracemalloc slows Python code down, so the timed runs are not traced).
+
+    Args:
+        fn (callable): Function without arguments.
+        repeats (int): Number of timed runs (the best one is reported).
+
+    Returns:
+        tuple: (result of the last call, best wall time in seconds, peak traced memory in MB).
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak / 2**20
+
+
+def benchmark_graph(G, name, k_values, seed, repeats=1, enhanced_kwargs=None):
+    """
+    Times every algorithm and the latency evaluator on one graph for each k.
+
+    Args:
+        G (nx.Graph): Graph with delay-weighted edges.
+        name (str): Label of the graph in the records.
+        k_values (list): Numbers of controllers.
+        seed (int): Seed of the Enhanced K-Means++ runs.
+        repeats (int): Number of timed runs per measurement.
+        enhanced_kwargs (dict, optional): Weight arguments of enhanced_k_means.
+
+    Returns:
+        list: One record (dict) per measurement with keys 'graph', 'nodes', 'edges', 'step',
+            'k', 'wall_time_s', 'peak_memory_mb', 'iterations', 'avg_latency', 'max_latency'.
+    """
+    enhanced_kwargs = enhanced_kwargs or dict(w_degree=0.2, w_betweenness=0.4, w_closeness=0.4)
+    records = []
+
+    def record(step, k, wall_time, peak_memory, iterations=None, latencies=None):
+        records.append({
+            "graph": name,
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+            "step": step,
+            "k": k,
+            "wall_time_s": wall_time,
+            "peak_memory_mb": peak_memory,
+            "iterations": iterations,
+            "avg_latency": latencies[0][0] if latencies else None,
+            "max_latency": latencies[1][0] if latencies else None,
+        })
+
+    delay_matrix, wall_time, peak_memory = measure(lambda: compute_delay_matrix(G), repeats)
+    record("delay_matrix", None, wall_time, peak_memory)
+    (betweenness, closeness), wall_time, peak_memory = measure(
+        lambda: compute_centralities(G, delay_matrix), repeats
+    )
+    record("centralities", None, wall_time, peak_memory)
+
+    algorithms = {
+        "advanced_k_means": lambda k, assigner: advanced_k_means(
+            G, k, delay_matrix, assigner=assigner
+        ),
+        "enhanced_k_means": lambda k, assigner: enhanced_k_means(
+            G, k, random.Random(seed), delay_matrix=delay_matrix,
+            betweenness=betweenness, closeness=closeness, assigner=assigner, **enhanced_kwargs
+        ),
+        "hdids": lambda k, assigner: hdids(G, k, delay_matrix),
+    }
+    for algorithm, run in algorithms.items():
+        for k in k_values:
+            (controllers, clusters), wall_time, peak_memory = measure(lambda: run(k, None), repeats)
+            counter = CountingAssigner(delay_matrix)
+            run(k, counter)
+            latencies = compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix)
+            record(algorithm, k, wall_time, peak_memory, counter.calls or None, latencies)
+
+            _, wall_time, peak_memory = measure(
+                lambda: compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix), repeats
+            )
+            record(f"latency_evaluation_{algorithm}", k, wall_time, peak_memory)
+    return records
+
+
+def run_benchmarks(
+    topology_dir="topologies",
+    synthetic_sizes=(250, 500, 1000),
+    k_values=range(1, 11),
+    propagation_speed_km_per_ms=204,
+    seed=42,
+    repeats=1,
+    output_dir=BENCHMARK_DIR,
+    label=None,
+):
+    """
+    Runs the benchmark suite on every GML file of topology_dir and on synthetic graphs of
+    increasing size, and saves the records as JSON (see benchmark_graph for the record fields).
+
+    Args:
+        topology_dir (str): Directory with the GML files.
+        synthetic_sizes (iterable): Node counts of the synthetic graphs.
+        k_values (iterable): Numbers of controllers.
+        propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms.
+        seed (int): Seed of the synthetic graphs and the Enhanced K-Means++ runs.
+        repeats (int): Number of timed runs per measurement.
+        output_dir (str or None): Directory of the JSON file. Not saved if None.
+        label (str, optional): File name stem (default: the current git commit).
+
+    Returns:
+        dict: {'meta': environment description, 'records': list of records}.
+    """
+    k_values = list(k_values)
+    graphs = [
+        (os.path.splitext(os.path.basename(path))[0],
+         lambda path=path: load_gml_to_delay_graph(path, propagation_speed_km_per_ms))
+        for path in sorted(glob.glob(os.path.join(topology_dir, "*.gml")))
+    ]
+    graphs += [
+        (f"synthetic_{n}", lambda n=n: add_delay_attributes(
+            generate_wan_topology(n, seed=seed), propagation_speed_km_per_ms
+        ))
+        for n in synthetic_sizes
+    ]
+
+    records = []
+    for name, load in graphs:
+        G = load()
+        print(f"[BENCH] {name}: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+        # k cannot exceed the number of nodes
+        records.extend(benchmark_graph(
+            G, name, [k for k in k_values if k <= G.number_of_nodes()], seed, repeats
+        ))
+
+    commit = git_commit()
+    results = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "networkx": nx.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeats": repeats,
+        },
+        "records": records,
+    }
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{label or commit or 'benchmark'}.json")
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Benchmark saved: {path}")
+    return results
+
+
+def compare_benchmarks(baseline, current, threshold=1.2):
+    """
+    Compares two benchmark results measurement by measurement.
+
+    Args:
+        baseline (dict): Results of run_benchmarks (or the loaded JSON file) used as reference.
+        current (dict): Results to compare against the baseline.
+        threshold (float): Ratio current/baseline above which a metric is reported as a regression.
+
+    Returns:
+        list: (graph, step, k, metric, baseline value, current value, ratio) for every regression.
+    """
+    def key(record):
+        return record["graph"], record["step"], record["k"]
+
+    reference = {key(r): r for r in baseline["records"]}
+    regressions = []
+    for record in current["records"]:
+        base = reference.get(key(record))
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if base[metric] and record[metric] / base[metric] > threshold:
+                regressions.append((*key(record), metric, base[metric], record[metric],
+                                    record[metric] / base[metric]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite of the placement algorithms.")
+    parser.add_argument("--topologies", default="topologies", help="Directory with the GML files")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[250, 500, 1000],
+                        help="Node counts of the synthetic graphs")
+    parser.add_argument("--kmax", type=int, default=10)
+    parser.add_argument("--speed", type=float, default=204, help="Propagation speed in km/ms")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output-dir", default=BENCHMARK_DIR)
+    parser.add_argument("--label", help="Results file name (default: current git commit)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--plot", action="store_true", help="Save the scaling curves")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.topologies, args.sizes, range(1, args.kmax + 1), args.speed,
+        args.seed, args.repeats, args.output_dir, args.label
+    )
+    if args.plot:
+        from utils.plot_utils import plot_scaling
+        plot_scaling(results["records"], args.output_dir)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_benchmarks(baseline, results)
+        for graph, step, k, metric, before, after, ratio in regressions:
+            print(f"[REGRESSION] {graph} {step} k={k} {metric}: {before:.4g} -> {after:.4g} (x{ratio:.2f})")
+        if not regressions:
+            print("No regressions.")
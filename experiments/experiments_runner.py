@@ -5,8 +5,12 @@ import matplotlib.pyplot as plt
 plt.rcParams['font.family'] = 'Arial'
 
 from utils.data_utils import load_gml_to_delay_graph
-from utils.experiment_utils import compute_latencies_for_experiment
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.helpers import compute_centralities
+from utils.parallel_utils import run_enhanced_k_means_parallel
+from utils.experiment_utils import compute_latencies_for_experiment, iter_placements
 from utils.plot_utils import plot_latency_comparison, plot_enhanced_kmeans_experiment
+from utils.results_utils import iter_placement_records
 
 
 from CONST import *
@@ -39,6 +43,8 @@ def run_latency_experiment_compare(
     os.makedirs(dir_path, exist_ok=True)
 
     G = load_gml_to_delay_graph(gml_file, propagation_speed_km_per_ms=propagation_speed_km_per_ms)
+    # All-pairs delays are computed once and shared by every algorithm and k
+    delay_matrix = compute_delay_matrix(G)
     k_values = list(range(1, kmax + 1))
 
     if log_k_values is None:
@@ -48,6 +54,9 @@ def run_latency_experiment_compare(
 
     rng = random.Random(seed)
 
+    # Centralities only depend on the graph: computed once for all enhanced k-means runs
+    betweenness, closeness = compute_centralities(G, delay_matrix)
+
     avg_latencies = {}
     max_latencies = {}
 
@@ -58,13 +67,19 @@ def run_latency_experiment_compare(
         print("=" * 80)
         print(f"## Algorithm: {name.upper()} ##")
 
+        # Deterministic algorithms: one placement per k (a single sweep for Advanced K-Means)
+        placements = None if name == "enhanced_k_means" else iter_placements(fn, G, kmax, delay_matrix)
+
         for k in k_values:
             # Select kwargs for enhanced k-means
             if name == "enhanced_k_means":
                 kwargs = enhanced_k_means_kwargs or {}
-                controllers, clusters = fn(G, k, rng, **kwargs)
+                controllers, clusters = fn(
+                    G, k, rng, delay_matrix=delay_matrix,
+                    betweenness=betweenness, closeness=closeness, **kwargs
+                )
             else:
-                controllers, clusters = fn(G, k)
+                _, controllers, clusters = next(placements)
 
             # Logging if k is selected
             if k in log_k_values:
@@ -76,7 +91,7 @@ def run_latency_experiment_compare(
                     print(f"  Controller {ctrl} ({ctrl_label}): {members_labels}")
 
             # Compute latencies using helper
-            avg_delay_list, max_delay_list = compute_latencies_for_experiment(G, k, controllers, clusters)
+            avg_delay_list, max_delay_list = compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix)
             avg_latency = avg_delay_list[0] if isinstance(avg_delay_list, list) else avg_delay_list
             max_latency = max_delay_list[0] if isinstance(max_delay_list, list) else max_delay_list
 
@@ -107,7 +122,8 @@ def run_enhanced_kmeans_experiment(
     kmax,
     enhanced_runs,
     seed,
-    enhanced_k_means_kwargs=None
+    enhanced_k_means_kwargs=None,
+    workers=None
 ):
     """
     Run latency experiments comparing advanced k-means and enhanced (probabilistic seeding) k-means++.
@@ -122,6 +138,7 @@ def run_enhanced_kmeans_experiment(
         enhanced_runs (int): Number of stochastic runs for each k for enhanced k-means.
         seed (int or None): Seed for reproducibility.
         enhanced_k_means_kwargs (dict): Weight arguments passed to advanced_k_means_fn.
+        workers (int, optional): Worker processes for the enhanced k-means runs (default: all CPU cores).
 
     Saves:
         Plots to 'plots/' directory.
@@ -131,6 +148,7 @@ def run_enhanced_kmeans_experiment(
 
     # Load topology
     G = load_gml_to_delay_graph(gml_file, propagation_speed_km_per_ms)
+    delay_matrix = compute_delay_matrix(G)
     k_values = list(range(1, kmax + 1))
 
     # Final delays list after experiments of Advanced K-Means
@@ -143,35 +161,29 @@ def run_enhanced_kmeans_experiment(
     max_delays_enhanced = []
     std_max_delays_enhanced = []
 
-    # Initialize rng with given seed
-    rng = random.Random(seed)
-
     # Kwargs could be optional
     kwargs = enhanced_k_means_kwargs or {}
 
+    # Enhanced K-Means++ runs for all k, each run seeded from (seed, k, run)
+    enhanced_results = run_enhanced_k_means_parallel(
+        G, k_values, enhanced_runs, seed, kwargs, workers, delay_matrix,
+        fn=clustering_fns["enhanced_k_means"]
+    )
+
     # Run experiment for k=1 to kmax
-    for k in range(1, kmax + 1):
+    for k, controllers, clusters in iter_placements(clustering_fns["advanced_k_means"], G, kmax, delay_matrix):
 
         # --- Advanced K-Means latency measurements ---
-        controllers, clusters = clustering_fns["advanced_k_means"](G, k)
 
-        advanced_avg, advanced_max = compute_latencies_for_experiment(G, k, controllers, clusters)
+        advanced_avg, advanced_max = compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix)
 
         # Experiments result lists for Advanced K-Means
         avg_delays_advanced.append(np.mean(advanced_avg))
         max_delays_advanced.append(np.max(advanced_max))
 
         # --- Enhanced K-Means++ latency measurements ---
-        enhanced_avg = []
-        enhanced_max = []
-
-        for run in range(enhanced_runs):
-            controllers_enhanced, clusters_enhanced = clustering_fns["enhanced_k_means"](G, k, rng, **kwargs)
-
-            run_enhanced_avg, run_enhanced_max = compute_latencies_for_experiment(G, k, controllers_enhanced, clusters_enhanced)
-
-            enhanced_avg.append(run_enhanced_avg)
-            enhanced_max.append(run_enhanced_max)
+        enhanced_avg = [result["avg_latency"] for result in enhanced_results[k]]
+        enhanced_max = [result["max_latency"] for result in enhanced_results[k]]
 
         # Experiments result lists for Enhanced K-Means++
         avg_delays_enhanced.append(np.mean(enhanced_avg))
@@ -193,3 +205,87 @@ def run_enhanced_kmeans_experiment(
     )
 
 
+
+def log_placements(placements, log_k_values=None):
+    """
+    Prints controllers, their cluster members and latencies for the selected k values
+    (first run of every algorithm).
+
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+        log_k_values (list or int, optional): k values for detailed logging.
+    """
+    if log_k_values is None:
+        log_k_values = []
+    if isinstance(log_k_values, int):
+        log_k_values = [log_k_values]
+
+    G = placements["graph"]
+    for name in placements["algorithms"]:
+        print("=" * 80)
+        print(f"## Algorithm: {name.upper()} ##")
+        for record in iter_placement_records(placements, name):
+            k = record["k"]
+            if k not in log_k_values or record["run"] != 0:
+                continue
+            controllers, clusters = record["controllers"], record["clusters"]
+            print("#" * 60)
+            print(f"k={k}: Controllers (IDs): {controllers}")
+            for ctrl in controllers:
+                ctrl_label = G.nodes[ctrl].get('label', str(ctrl))
+                members_labels = [G.nodes[n].get('label', str(n)) for n in clusters[ctrl]]
+                print(f"  Controller {ctrl} ({ctrl_label}): {members_labels}")
+            print(f"  [k={k}] avg_latency = {record['avg_latency']:.4f}, max_latency = {record['max_latency']:.4f}")
+        print("=" * 80)
+
+def plot_placements(placements):
+    """
+    Plots both latency experiments from precomputed placement records:
+    the comparison of all algorithms (first run of each) and, when both are present,
+    Advanced K-Means versus Enhanced K-Means++ with mean ± std over all runs.
+
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+
+    Saves:
+        Plots to 'plots/' directory.
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    k_values = placements["k_values"]
+    algorithms = placements["algorithms"]
+
+    avg_latencies = {
+        name: [records[k][0]["avg_latency"] for k in k_values] for name, records in algorithms.items()
+    }
+    max_latencies = {
+        name: [records[k][0]["max_latency"] for k in k_values] for name, records in algorithms.items()
+    }
+
+    plot_latency_comparison(
+        k_values,
+        avg_latencies,
+        max_latencies,
+        algorithms,
+        experiment_name="Advanced K-Means vs Enhanced K-Means++",
+        topology_name=topology_name,
+        output_dir=dir_path
+    )
+
+    if "advanced_k_means" not in algorithms or "enhanced_k_means" not in algorithms:
+        return
+
+    enhanced_avg = [[r["avg_latency"] for r in algorithms["enhanced_k_means"][k]] for k in k_values]
+    enhanced_max = [[r["max_latency"] for r in algorithms["enhanced_k_means"][k]] for k in k_values]
+
+    plot_enhanced_kmeans_experiment(
+        k_values,
+        avg_latencies["advanced_k_means"],
+        max_latencies["advanced_k_means"],
+        [np.mean(delays) for delays in enhanced_avg],
+        [np.std(delays) for delays in enhanced_avg],
+        [np.mean(delays) for delays in enhanced_max],
+        [np.std(delays) for delays in enhanced_max],
+        experiment_name="Advanced K-Means vs Enhanced K-Means++ (with std dev)",
+        topology_name=topology_name,
+        output_dir=dir_path
+    )
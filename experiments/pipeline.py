@@ -0,0 +1,255 @@
+import os
+from contextlib import nullcontext
+from itertools import groupby
+from operator import itemgetter
+
+from utils.cache_utils import TOPOLOGY_CACHE_DIR, load_topology
+from algorithms.delay_matrix import DelayMatrix
+from algorithms.advanced_k_means import advanced_k_means, advanced_k_means_sweep
+from algorithms.enhanced_k_means import enhanced_k_means
+from algorithms.swap_k_medoids import swap_k_medoids, swap_k_medoids_sweep
+from utils.parallel_utils import iter_enhanced_k_means_runs
+from utils.experiment_utils import compute_latencies_for_experiment, evaluate_placements
+from utils.load_utils import compute_controller_load, save_placement_loads
+from utils.results_utils import (
+    ResultsWriter,
+    save_placements_to_json,
+    save_placements_to_npz,
+    save_placement_profiles,
+    dir_path as results_dir
+)
+from algorithms.instrumentation import Profiler
+from algorithms.bounded_assignment import BoundedAssigner
+from experiments.experiments_runner import log_placements, plot_placements
+
+
+def compute_placements(
+    gml_file,
+    clustering_fns,
+    propagation_speed_km_per_ms,
+    kmax,
+    enhanced_runs,
+    seed,
+    enhanced_k_means_kwargs=None,
+    workers=None,
+    cache_dir=TOPOLOGY_CACHE_DIR,
+    profile=False,
+    results_path=None,
+    keep_clusters=True,
+    bounded=False
+):
+    """
+    Runs every clustering algorithm once for every k and collects the placement records
+    (centers, clusters, latencies and controller loads) consumed by plotting, JSON writing
+    and load reporting.
+
+    Advanced K-Means (and Swap K-Medoids on top of it) is computed with one incremental sweep,
+    Enhanced K-Means++ with enhanced_runs seeded runs per k on a process pool, and any other
+    algorithm (deterministic, called as fn(G, k)) once per k. The sweeps are only used for the
+    stock advanced_k_means and swap_k_medoids functions; the 'enhanced_k_means' entry (or the
+    stock function under any name) is run by the pool with its registered function; with a
+    dense delay matrix the latencies of its runs are evaluated per k in one batch
+    (evaluate_placements, same values as compute_latencies_for_experiment).
+
+    Every record is written to the NDJSON file results_path (see ResultsWriter) as soon as it is
+    computed. With keep_clusters=False the clusters are then dropped from the in-memory record,
+    so memory does not grow with runs x k x n; the output stages read them back from the file
+    (see iter_placement_records).
+
+    Args:
+        gml_file (str): Path to network topology in GML format.
+        clustering_fns (dict): Callable algorithm functions {algorithm_name: clustering_fn}
+        propagation_speed_km_per_ms (float): Signal propagation speed in km/ms.
+        kmax (int): Max number of controllers to test.
+        enhanced_runs (int): Number of stochastic runs for each k for enhanced k-means.
+        seed (int or None): Seed for reproducibility.
+        enhanced_k_means_kwargs (dict): Weight arguments passed to enhanced_k_means.
+        workers (int, optional): Worker processes for the enhanced k-means runs (default: all CPU cores).
+        cache_dir (str or None): Directory of the parsed topology / delay matrix cache (None disables it).
+        profile (bool): Collect per-phase timings and counters (see algorithms.instrumentation)
+            for every Advanced K-Means step and Enhanced K-Means++ run.
+        results_path (str, optional): NDJSON file the records are streamed to (overwritten).
+            No file is written if None.
+        keep_clusters (bool): Keep the clusters of every record in memory. False requires results_path.
+        bounded (bool): Use the triangle-inequality bounded assignment (BoundedAssigner, same
+            results) in the Advanced K-Means sweep and the Enhanced K-Means++ runs; its pruned
+            comparisons are reported in the profiles. Needs a dense delay matrix (ignored otherwise).
+
+    Returns:
+        dict: {
+            'graph': Topology (immutable, array-backed; see algorithms.topology),
+            'k_values': list,
+            'runs': int,
+            'algorithms': {algorithm_name: {k: [record for each run]}},
+            'results_path': str or None,
+            'keep_clusters': bool,
+            'profile': profile of the topology loading (only if profile is True)
+        }
+        Each record is a dict with keys 'k', 'run', 'controllers', 'clusters', 'avg_latency',
+        'max_latency', 'iterations', 'controller_loads' and 'max_controller_load' (and 'profile'
+        for the profiled algorithms if profile is True). 'iterations' is the number of local
+        K-Means cycle passes (of the whole run for Enhanced K-Means++, of step k for the Advanced
+        K-Means sweep) and None for the other algorithms. 'clusters' is None if keep_clusters is False.
+    """
+    if not keep_clusters and results_path is None:
+        raise ValueError("keep_clusters=False requires a results_path to read the clusters back from.")
+
+    topology_profiler = Profiler()
+    with topology_profiler.phase("load_topology"):
+        G, delay_matrix = load_topology(gml_file, propagation_speed_km_per_ms, cache_dir, compact=True)
+    k_values = list(range(1, kmax + 1))
+    kwargs = enhanced_k_means_kwargs or {}
+    if bounded and not isinstance(delay_matrix, DelayMatrix):
+        print("[WARN] The bounded assignment needs a dense delay matrix; using the plain assignment.")
+        bounded = False
+
+    if results_path is not None:
+        os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+
+    algorithms = {}
+    with (ResultsWriter(results_path) if results_path is not None else nullcontext()) as writer:
+        for name, fn in clustering_fns.items():
+            print(f"Computing placements: {name}")
+            records = {k: [] for k in k_values}
+            for record in _iter_records(
+                name, fn, G, delay_matrix, k_values, enhanced_runs, seed, kwargs, workers, profile, bounded
+            ):
+                record.update(compute_controller_load(record["clusters"]))
+                if writer is not None:
+                    writer.write(name, record)
+                if not keep_clusters:
+                    record["clusters"] = None
+                records[record["k"]].append(record)
+            algorithms[name] = records
+
+    placements = {
+        "graph": G,
+        "k_values": k_values,
+        "runs": enhanced_runs,
+        "algorithms": algorithms,
+        "results_path": results_path,
+        "keep_clusters": keep_clusters
+    }
+    if profile:
+        placements["profile"] = topology_profiler.to_dict()
+    return placements
+
+
+def _iter_records(name, fn, G, delay_matrix, k_values, enhanced_runs, seed, kwargs, workers, profile, bounded):
+    # Placement records of one algorithm (without loads), in k order, as they are computed
+    if fn is enhanced_k_means or name == "enhanced_k_means":
+        # With a dense matrix the runs of every k are evaluated in one batch
+        batched = isinstance(delay_matrix, DelayMatrix)
+        runs = iter_enhanced_k_means_runs(
+            G, k_values, enhanced_runs, seed, kwargs, workers, delay_matrix,
+            profile=profile, fn=fn, latencies=not batched, bounded=bounded
+        )
+        if not batched:
+            yield from runs
+            return
+        for _, k_runs in groupby(runs, key=itemgetter("k")):
+            k_runs = list(k_runs)
+            latencies = evaluate_placements(
+                delay_matrix, [(r["k"], r["controllers"], r["clusters"]) for r in k_runs]
+            )
+            for record, avg_delay, max_delay in zip(
+                k_runs, latencies["avg_latency"].tolist(), latencies["max_latency"].tolist()
+            ):
+                record["avg_latency"] = avg_delay
+                record["max_latency"] = max_delay
+                yield record
+        return
+
+    kmax = k_values[-1]
+    profiler = None
+    if fn is advanced_k_means:
+        profiler = Profiler() if profile else None
+        assigner = BoundedAssigner(delay_matrix, profiler) if bounded else None
+        solutions = advanced_k_means_sweep(G, kmax, delay_matrix, assigner=assigner, profiler=profiler)
+    elif fn is swap_k_medoids:
+        solutions = (solution + (None,) for solution in swap_k_medoids_sweep(G, kmax, delay_matrix))
+    else:
+        solutions = ((k, *fn(G, k, delay_matrix=delay_matrix), None) for k in k_values)
+    for k, controllers, clusters, iterations in solutions:
+        avg_delay, max_delay = compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix)
+        record = {
+            "k": k,
+            "run": 0,
+            "controllers": controllers,
+            "clusters": clusters,
+            "avg_latency": avg_delay[0],
+            "max_latency": max_delay[0],
+            "iterations": iterations,
+        }
+        if profiler is not None:
+            # The sweep is paused at k: the profile since the previous step covers step k
+            record["profile"] = profiler.snapshot()
+        yield record
+
+
+def run_experiment_pipeline(
+    gml_file,
+    clustering_fns,
+    propagation_speed_km_per_ms,
+    kmax,
+    enhanced_runs,
+    seed,
+    enhanced_k_means_kwargs=None,
+    workers=None,
+    log_k_values=None,
+    cache_dir=TOPOLOGY_CACHE_DIR,
+    profile=False,
+    results_path=None,
+    keep_clusters=True,
+    bounded=False
+):
+    """
+    Single-pass experiment: computes all placements once (see compute_placements), streaming
+    every record to an NDJSON results file, and hands them to every output stage - logging,
+    latency plots, results JSON, compact .npz placements and controller loads.
+
+    Args:
+        gml_file (str): Path to network topology in GML format.
+        clustering_fns (dict): Callable algorithm functions {algorithm_name: clustering_fn}
+        propagation_speed_km_per_ms (float): Signal propagation speed in km/ms.
+        kmax (int): Max number of controllers to test.
+        enhanced_runs (int): Number of stochastic runs for each k for enhanced k-means.
+        seed (int or None): Seed for reproducibility.
+        enhanced_k_means_kwargs (dict): Weight arguments passed to enhanced_k_means.
+        workers (int, optional): Worker processes for the enhanced k-means runs (default: all CPU cores).
+        log_k_values (list or int, optional): k values for detailed logging.
+        cache_dir (str or None): Directory of the parsed topology / delay matrix cache (None disables it).
+        profile (bool): Collect per-run profiles and save them next to the results JSON files.
+        results_path (str, optional): NDJSON results file (default: results/<topology>/results.ndjson).
+        keep_clusters (bool): Keep the clusters in memory; if False they are read back from
+            results_path by the output stages.
+        bounded (bool): Use the bounded assignment step (see compute_placements).
+
+    Returns:
+        dict: Placement records as returned by compute_placements.
+    """
+    placements = compute_placements(
+        gml_file,
+        clustering_fns,
+        propagation_speed_km_per_ms,
+        kmax,
+        enhanced_runs,
+        seed,
+        enhanced_k_means_kwargs,
+        workers,
+        cache_dir,
+        profile,
+        results_path or f"{results_dir}/results.ndjson",
+        keep_clusters,
+        bounded
+    )
+
+    log_placements(placements, log_k_values)
+    plot_placements(placements)
+    save_placements_to_json(placements)
+    save_placements_to_npz(placements)
+    save_placement_loads(placements)
+    if profile:
+        save_placement_profiles(placements)
+
+    return placements
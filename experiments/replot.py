@@ -0,0 +1,94 @@
+import os
+import glob
+import argparse
+
+from utils.results_utils import PlacementResults, iter_results, dir_path
+from experiments.experiments_runner import plot_placements
+
+# Order of the algorithms in the comparison plots (the order of clustering_fns in main.py)
+ALGORITHM_ORDER = ("advanced_k_means", "enhanced_k_means", "swap_k_medoids")
+
+
+def load_saved_placements(results_dir=dir_path):
+    """
+    Rebuilds the latency part of the placement records from saved results, as needed by
+    plot_placements: the <algorithm>_placements.npz files of the experiment pipeline, or its
+    results.ndjson file if there are none. Controllers and clusters are not loaded.
+
+    (The results JSON files only hold the average latencies, not the maximum ones, so they
+    cannot reproduce the plots.)
+
+    Args:
+        results_dir (str): Directory of the saved results.
+
+    Returns:
+        dict: {
+            'k_values': list (k values present for every algorithm),
+            'algorithms': {algorithm_name: {k: [record for each run]}}
+        }
+        Each record is a dict with keys 'k', 'run', 'avg_latency' and 'max_latency'.
+    """
+    algorithms = {}
+    npz_files = sorted(glob.glob(os.path.join(results_dir, "*_placements.npz")))
+    for path in npz_files:
+        name = os.path.basename(path)[:-len("_placements.npz")].replace('-', '_')
+        results = PlacementResults(path)
+        records = {}
+        for i in range(len(results)):
+            records.setdefault(int(results.k[i]), []).append({
+                "k": int(results.k[i]),
+                "run": int(results.run[i]),
+                "avg_latency": float(results.avg_latency[i]),
+                "max_latency": float(results.max_latency[i]),
+            })
+        algorithms[name] = records
+
+    ndjson_file = os.path.join(results_dir, "results.ndjson")
+    if not npz_files and os.path.exists(ndjson_file):
+        for record in iter_results(ndjson_file):
+            algorithms.setdefault(record["algorithm"], {}).setdefault(record["k"], []).append({
+                "k": record["k"],
+                "run": record["run"],
+                "avg_latency": record["avg_latency"],
+                "max_latency": record["max_latency"],
+            })
+
+    if not algorithms:
+        raise FileNotFoundError(
+            f"No *_placements.npz or results.ndjson file in {results_dir}; run the experiment pipeline first."
+        )
+
+    # The first run of every k is the one plotted in the comparison
+    for records in algorithms.values():
+        for k_records in records.values():
+            k_records.sort(key=lambda r: r["run"])
+
+    order = [name for name in ALGORITHM_ORDER if name in algorithms]
+    order += sorted(name for name in algorithms if name not in ALGORITHM_ORDER)
+    k_values = sorted(set.intersection(*(set(records) for records in algorithms.values())))
+    return {
+        "k_values": k_values,
+        "algorithms": {name: algorithms[name] for name in order},
+    }
+
+
+def replot(results_dir=dir_path):
+    """
+    Regenerates the latency plots of the experiment pipeline from saved results, without
+    running the algorithms again (e.g. after changing max_ylim / ytick_major in CONST.py).
+
+    Args:
+        results_dir (str): Directory of the saved results (see load_saved_placements).
+
+    Saves:
+        Plots to 'plots/' directory.
+    """
+    plot_placements(load_saved_placements(results_dir))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-plot the latency figures from saved results.")
+    parser.add_argument("--results-dir", default=dir_path,
+                        help="Directory of the saved results (default: results/<topo_dir of CONST.py>)")
+    args = parser.parse_args()
+    replot(args.results_dir)
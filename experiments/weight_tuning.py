@@ -0,0 +1,134 @@
+import os
+import json
+import itertools
+import numpy as np
+
+from algorithms.helpers import compute_centralities
+from algorithms.enhanced_k_means import best_weighted_initial_centers
+from utils.cache_utils import TOPOLOGY_CACHE_DIR, load_topology
+from utils.parallel_utils import derive_seed, run_enhanced_tasks
+
+
+def simplex_weight_grid(step=0.1):
+    """
+    Regular grid of weight vectors (w_degree, w_betweenness, w_closeness) on the simplex
+    (non-negative weights summing to 1).
+
+    Args:
+        step (float): Grid resolution (1/step must be an integer).
+
+    Returns:
+        list: List of (w_degree, w_betweenness, w_closeness) tuples.
+    """
+    n = int(round(1 / step))
+    return [
+        (i / n, j / n, (n - i - j) / n)
+        for i in range(n + 1) for j in range(n + 1 - i)
+    ]
+
+
+def sample_simplex_weights(num_samples, seed=None):
+    """
+    Uniform random sample of weight vectors (w_degree, w_betweenness, w_closeness) on the simplex.
+
+    Args:
+        num_samples (int): Number of weight vectors.
+        seed (int, optional): Seed for reproducibility.
+
+    Returns:
+        list: List of (w_degree, w_betweenness, w_closeness) tuples.
+    """
+    rng = np.random.default_rng(seed)
+    return [tuple(w) for w in rng.dirichlet(np.ones(3), size=num_samples).tolist()]
+
+
+def tune_enhanced_weights(
+    gml_file,
+    propagation_speed_km_per_ms,
+    k_values,
+    weights,
+    runs,
+    seed,
+    workers=None,
+    output_dir=None,
+    cache_dir=TOPOLOGY_CACHE_DIR
+):
+    """
+    Evaluates Enhanced K-Means++ centrality weights over a set of weight vectors, k values and seeds,
+    and reports the weight vector with the lowest mean average latency.
+
+    The weights only influence the initial center (Algorithm 1), so all weight vectors are scored
+    in one batch and the stochastic runs are executed once per distinct initial center.
+    Every (k, run) uses the same derived seed for all weight vectors, so the candidates are
+    compared on identical random streams. The graph, delay matrix and centralities are loaded
+    or computed once and shared with the worker processes.
+
+    Args:
+        gml_file (str): Path to network topology in GML format.
+        propagation_speed_km_per_ms (float): Signal propagation speed in km/ms.
+        k_values (list): Numbers of controllers to evaluate.
+        weights (list): Weight vectors (w_degree, w_betweenness, w_closeness), e.g. from
+            simplex_weight_grid or sample_simplex_weights.
+        runs (int): Number of stochastic runs (seeds) for each k.
+        seed (int or None): Base seed for reproducibility.
+        workers (int, optional): Number of worker processes (default: all CPU cores).
+        output_dir (str, optional): If given, the report is saved to output_dir/weight_tuning.json.
+        cache_dir (str or None): Directory of the parsed topology / delay matrix cache (None disables it).
+
+    Returns:
+        dict: {
+            'best_weights': (w_degree, w_betweenness, w_closeness),
+            'best_score': float,
+            'results': [{'weights', 'initial_center', 'score', 'mean_per_k'} for each weight vector]
+        }
+        The score is the mean average latency over all k values and runs.
+    """
+    G, delay_matrix = load_topology(gml_file, propagation_speed_km_per_ms, cache_dir)
+    betweenness, closeness = compute_centralities(G, delay_matrix)
+    k_values = list(k_values)
+
+    initial_centers = best_weighted_initial_centers(G, betweenness, closeness, weights, delay_matrix)
+    distinct_centers = list(dict.fromkeys(initial_centers))
+    print(f"{len(weights)} weight vectors -> {len(distinct_centers)} distinct initial centers")
+
+    base_seed = np.random.SeedSequence(seed).entropy
+    tasks = [
+        (k, run, derive_seed(base_seed, k, run), center)
+        for center, k, run in itertools.product(distinct_centers, k_values, range(runs))
+    ]
+    # Weights are not used when the initial center is given
+    kwargs = dict(w_degree=0.0, w_betweenness=0.0, w_closeness=0.0)
+    task_results = run_enhanced_tasks(G, tasks, kwargs, workers, delay_matrix)
+
+    latencies = {center: {k: [] for k in k_values} for center in distinct_centers}
+    for (k, _, _, center), result in zip(tasks, task_results):
+        latencies[center][k].append(result["avg_latency"])
+
+    results = []
+    for w, center in zip(weights, initial_centers):
+        mean_per_k = [float(np.mean(latencies[center][k])) for k in k_values]
+        results.append({
+            "weights": [float(x) for x in w],
+            "initial_center": center,
+            "score": float(np.mean(mean_per_k)),
+            "mean_per_k": mean_per_k,
+        })
+
+    best = min(results, key=lambda r: r["score"])
+    report = {
+        "best_weights": tuple(best["weights"]),
+        "best_score": best["score"],
+        "k_values": k_values,
+        "runs": runs,
+        "results": results,
+    }
+    print(f"Best weights (w_degree, w_betweenness, w_closeness) = {report['best_weights']}, "
+          f"mean avg latency = {report['best_score']:.4f} ms")
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        with open(f"{output_dir}/weight_tuning.json", "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Weight tuning results saved to {output_dir}/weight_tuning.json")
+
+    return report
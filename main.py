@@ -1,7 +1,6 @@
-from utils.load_utils import run_and_save_controller_loads
-from utils.results_utils import save_results_to_json
-from experiments.experiments_runner import run_enhanced_kmeans_experiment
-from experiments.experiments_runner import run_latency_experiment_compare
+from experiments.pipeline import run_experiment_pipeline
+from experiments.weight_tuning import tune_enhanced_weights, simplex_weight_grid
+from experiments.replot import replot
 
 from CONST import *
 
@@ -27,6 +26,7 @@ if __name__ == "__main__":
 
     from algorithms.advanced_k_means import advanced_k_means
     from algorithms.enhanced_k_means import enhanced_k_means
+    from algorithms.swap_k_medoids import swap_k_medoids
 
     if __name__ == "__main__":
 
@@ -35,11 +35,22 @@ if __name__ == "__main__":
         propagation_speed_km_per_ms = 204
         seed = 42
         enhanced_algorithm_runs = 10
+        # Worker processes for Enhanced K-Means++ runs (None = all CPU cores)
+        workers = None
+        # Set to True to save per-phase timings and counters of every run next to the results
+        profile = False
+        # Set to False to drop the clusters from memory once written to results/<topo_dir>/results.ndjson
+        # (the output stages read them back from the file)
+        keep_clusters = True
+        # Set to True to skip provably unchanged node-center comparisons in the K-Means assignment
+        # steps (triangle-inequality bounds, same placements)
+        bounded_assignment = False
         k_value = range(1,kmax+1)
 
         clustering_fns = {
             "advanced_k_means": advanced_k_means,
-            "enhanced_k_means": enhanced_k_means
+            "enhanced_k_means": enhanced_k_means,
+            "swap_k_medoids": swap_k_medoids
         }
 
         # Enhanced K-Means kwargs
@@ -49,44 +60,41 @@ if __name__ == "__main__":
             w_closeness=0.4
         )
 
-        run_latency_experiment_compare(
-            gml_file,
-            clustering_fns,
-            propagation_speed_km_per_ms,
-            kmax,
-            seed,
-            enhanced_kwargs,
-            k_value
-        )
-
-        run_enhanced_kmeans_experiment(
-            gml_file,
-            clustering_fns,
-            propagation_speed_km_per_ms,
-            kmax,
-            enhanced_algorithm_runs,
-            seed,
-            enhanced_kwargs
-        )
-
-        save_results_to_json(
-            gml_file,
-            clustering_fns,
-            propagation_speed_km_per_ms,
-            kmax,
-            enhanced_algorithm_runs,
-            seed,
-            enhanced_kwargs
-        )
-
-        run_and_save_controller_loads(
-            gml_file,
-            propagation_speed_km_per_ms,
-            kmax,
-            clustering_fns,
-            seed,
-            enhanced_kwargs
-        )
-
+        # Set to True to search the Enhanced K-Means++ weights for every topology
+        # instead of running the experiments
+        tune_weights = False
 
+        # Set to True to only regenerate the plots from the saved results of topo_dir
+        # (e.g. after changing max_ylim / ytick_major in CONST.py)
+        replot_only = False
 
+        if replot_only:
+            replot()
+        elif tune_weights:
+            for topo, topo_file in topology_files.items():
+                tune_enhanced_weights(
+                    topo_file,
+                    propagation_speed_km_per_ms,
+                    k_value,
+                    simplex_weight_grid(step=0.05),
+                    enhanced_algorithm_runs,
+                    seed,
+                    workers,
+                    output_dir=f"results/{topo}"
+                )
+        else:
+            # Placements are computed once and shared by plots, results JSON and controller loads
+            run_experiment_pipeline(
+                gml_file,
+                clustering_fns,
+                propagation_speed_km_per_ms,
+                kmax,
+                enhanced_algorithm_runs,
+                seed,
+                enhanced_kwargs,
+                workers,
+                k_value,
+                profile=profile,
+                keep_clusters=keep_clusters,
+                bounded=bounded_assignment
+            )
@@ -0,0 +1,126 @@
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import networkx as nx
+
+from utils.data_utils import load_gml_to_delay_graph
+from algorithms.delay_matrix import DENSE_MAX_NODES, DelayMatrix, make_delay_matrix
+from algorithms.topology import Topology
+
+# Default location of cached topologies (parsed graph + all-pairs delay matrix)
+TOPOLOGY_CACHE_DIR = ".cache/topologies"
+
+
+def topology_cache_key(gml_file_path, propagation_speed_km_per_ms):
+    """
+    Builds the cache key of a topology: hash of the GML file content (first 16 hex digits)
+    followed by the hash of the propagation speed (last 16 hex digits).
+    Any change of the file (or of the speed) produces a different key.
+
+    Args:
+        gml_file_path (str): Path to the GML file.
+        propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms.
+
+    Returns:
+        str: Hex digest identifying the cached entry.
+    """
+    content = hashlib.sha256()
+    with open(gml_file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            content.update(chunk)
+    speed = hashlib.sha256(repr(float(propagation_speed_km_per_ms)).encode())
+    return content.hexdigest()[:16] + speed.hexdigest()[:16]
+
+
+def load_topology(
+    gml_file_path,
+    propagation_speed_km_per_ms,
+    cache_dir=TOPOLOGY_CACHE_DIR,
+    compact=False,
+    max_dense_nodes=DENSE_MAX_NODES
+):
+    """
+    Loads a topology together with its all-pairs delay matrix, using an on-disk cache.
+
+    The delay matrix is built by make_delay_matrix: dense up to max_dense_nodes nodes, a
+    LazyDelayMatrix (rows computed on demand) above.
+
+    The cache entry (an .npz file under cache_dir) stores the node list with attributes,
+    the edge list with attributes and the dense delay matrix (only the graph for a lazy one).
+    It is keyed by the GML content hash and the propagation speed; when a new entry is written,
+    the entries of previous versions of the same GML file at the same speed are removed
+    (entries of other speeds are kept).
+
+    Args:
+        gml_file_path (str): Path to the GML file.
+        propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms.
+        cache_dir (str or None): Cache directory. If None, no cache is used.
+        compact (bool): Return the graph as an immutable array-backed Topology
+            (see load_gml_to_delay_graph).
+        max_dense_nodes (int): Largest number of nodes for a dense delay matrix.
+
+    Returns:
+        tuple:
+            - G (nx.Graph or Topology): Graph as returned by load_gml_to_delay_graph.
+            - delay_matrix (DelayMatrix or LazyDelayMatrix): All-pairs shortest path delays of G.
+    """
+    if cache_dir is None:
+        G = load_gml_to_delay_graph(gml_file_path, propagation_speed_km_per_ms, compact=compact)
+        return G, make_delay_matrix(G, max_dense_nodes=max_dense_nodes)
+
+    stem = os.path.splitext(os.path.basename(gml_file_path))[0]
+    key = topology_cache_key(gml_file_path, propagation_speed_km_per_ms)
+    cache_file = os.path.join(cache_dir, f"{stem}_{key}.npz")
+
+    if os.path.exists(cache_file):
+        try:
+            G, matrix = _read_cache(cache_file)
+            graph = Topology.from_networkx(G) if compact else G
+            if matrix is None:
+                return graph, make_delay_matrix(graph, max_dense_nodes=max_dense_nodes)
+            return graph, DelayMatrix(list(G.nodes()), matrix)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Ignoring unreadable topology cache {cache_file}: {e}")
+
+    G = load_gml_to_delay_graph(gml_file_path, propagation_speed_km_per_ms)
+    graph = Topology.from_networkx(G) if compact else G
+    delay_matrix = make_delay_matrix(graph, max_dense_nodes=max_dense_nodes)
+    _write_cache(cache_file, G, delay_matrix)
+
+    # Drop entries of previous versions of this file at the same speed
+    entry = re.compile(rf"^{re.escape(stem)}_([0-9a-f]{{16}})([0-9a-f]{{16}})\.npz$")
+    for name in os.listdir(cache_dir):
+        match = entry.match(name)
+        if match and match.group(2) == key[16:] and match.group(1) != key[:16]:
+            os.remove(os.path.join(cache_dir, name))
+    return graph, delay_matrix
+
+
+def _write_cache(cache_file, G, delay_matrix):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    meta = {
+        "graph": G.graph,
+        "nodes": [[n, data] for n, data in G.nodes(data=True)],
+        "edges": [[u, v, data] for u, v, data in G.edges(data=True)],
+    }
+    # A lazy delay matrix has no dense array: only the graph is cached
+    arrays = {"delay_matrix": delay_matrix.matrix} if isinstance(delay_matrix, DelayMatrix) else {}
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    # Atomic replace, so a concurrent reader never sees a half-written entry
+    os.replace(tmp_file, cache_file)
+
+
+def _read_cache(cache_file):
+    with np.load(cache_file, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        matrix = data["delay_matrix"] if "delay_matrix" in data.files else None
+
+    G = nx.Graph()
+    G.graph.update(meta["graph"])
+    G.add_nodes_from((n, attrs) for n, attrs in meta["nodes"])
+    G.add_edges_from((u, v, attrs) for u, v, attrs in meta["edges"])
+    return G, matrix
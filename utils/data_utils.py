@@ -1,31 +1,66 @@
+import math
+import numpy as np
 import networkx as nx
 
+from algorithms.topology import Topology
 
-def load_gml_to_delay_graph(gml_file_path, propagation_speed_km_per_ms):
+
+def load_gml_to_delay_graph(gml_file_path, propagation_speed_km_per_ms, compact=False):
     """
     Loads a GML file representing a network topology and converts it to an undirected graph G,
     where the edges are weighted by propagation delays in milliseconds (ms).
     The propagation delay for each edge is calculated as: delay_ms = distance_km / propagation_speed_km_per_ms.
 
     Args:
-        gml_file_path (str): Path to the GML file.
+        gml_file_path (str): Path to the GML file (or to a .npz file, see write_topology_npz).
         propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms (default: 0.2 km/ms, which is ~200,000 km/s).
             Typical values:
                 - 0.2 km/ms: optical fiber (~200,000 km/s, 2/3 speed of light)
                 - 0.3 km/ms: vacuum (speed of light)
+        compact (bool): If True, an immutable array-backed Topology (algorithms.topology) is
+            returned instead; a .npz file is read straight into its arrays.
 
     Returns:
-        G (nx.Graph): An undirected NetworkX graph where edges are weighted with propagation delays (ms).
+        G (nx.Graph or Topology): An undirected NetworkX graph where edges are weighted with propagation delays (ms).
             Each node retains its GML attributes (such as 'label', 'lon', 'lat', etc.).
             Each edge has an attribute 'delay_ms' (propagation delay in ms).
     """
-    # Load the graph from GML file
-    G = nx.read_gml(gml_file_path, label='id')
+    if compact and gml_file_path.endswith(".npz"):
+        data = _read_topology_arrays(gml_file_path)
+        return Topology.from_edges(
+            data['ids'].tolist(), data['source'].tolist(), data['target'].tolist(),
+            data['dist'] / propagation_speed_km_per_ms, data['dist'],
+            data['label'], data['lat'], data['lon'], str(data['name'])
+        )
+
+    # Load the graph from GML file (or from the binary format of write_topology_npz)
+    if gml_file_path.endswith(".npz"):
+        G = read_topology_npz(gml_file_path)
+    else:
+        G = nx.read_gml(gml_file_path, label='id')
 
     # Convert to undirected graph if necessary
     if not isinstance(G, nx.Graph):
         G = nx.Graph(G)
 
+    G = add_delay_attributes(G, propagation_speed_km_per_ms)
+    if compact:
+        return Topology.from_networkx(G)
+    return G
+
+
+def add_delay_attributes(G, propagation_speed_km_per_ms):
+    """
+    Sets the 'delay_ms' (and 'weight') attribute of every edge from its 'dist' attribute (km),
+    as load_gml_to_delay_graph does (e.g. for graphs from utils.topology_generator).
+
+    Args:
+        G (nx.Graph): Graph whose edges have a 'dist' attribute in km. Modified in place.
+        propagation_speed_km_per_ms (float): Speed of signal propagation in km/ms.
+
+    Returns:
+        G (nx.Graph): The same graph.
+    """
     # For each edge, compute propagation delay (in ms) based on 'dist' (distance in km)
     for u, v, data in G.edges(data=True):
         if 'dist' not in data:
@@ -39,6 +74,64 @@ def load_gml_to_delay_graph(gml_file_path, propagation_speed_km_per_ms):
     return G
 
 
+def write_topology_npz(G, path):
+    """
+    Writes a topology in a compact binary format (.npz), much faster to read and write than GML
+    for large graphs. Only the graph name, the integer node ids with their 'label', 'lat' and
+    'lon' attributes and the edges with their 'dist' attribute are stored.
+
+    Args:
+        G (nx.Graph): Topology with integer node ids and 'dist' on every edge.
+        path (str): Output .npz file.
+    """
+    nodes = list(G.nodes())
+    edges = list(G.edges(data='dist'))
+    np.savez_compressed(
+        path,
+        name=np.array(str(G.graph.get('name', ''))),
+        ids=np.array(nodes, dtype=np.int64),
+        label=np.array([str(G.nodes[n].get('label', n)) for n in nodes]),
+        lat=np.array([G.nodes[n].get('lat', np.nan) for n in nodes], dtype=float),
+        lon=np.array([G.nodes[n].get('lon', np.nan) for n in nodes], dtype=float),
+        source=np.array([u for u, _, _ in edges], dtype=np.int64),
+        target=np.array([v for _, v, _ in edges], dtype=np.int64),
+        dist=np.array([d for _, _, d in edges], dtype=float),
+    )
+
+
+def read_topology_npz(path):
+    """
+    Reads a topology written by write_topology_npz.
+
+    Args:
+        path (str): Input .npz file.
+
+    Returns:
+        G (nx.Graph): Topology with the same attributes as read from GML ('label', 'lat', 'lon' on
+            nodes, 'dist' on edges; missing coordinates are not set).
+    """
+    data = _read_topology_arrays(path)
+    G = nx.Graph(name=str(data['name']))
+    for n, label, lat, lon in zip(data['ids'].tolist(), data['label'].tolist(),
+                                  data['lat'].tolist(), data['lon'].tolist()):
+        attrs = {'label': label}
+        if not math.isnan(lat):
+            attrs['lat'] = lat
+        if not math.isnan(lon):
+            attrs['lon'] = lon
+        G.add_node(n, **attrs)
+    G.add_edges_from(
+        (u, v, {'dist': d})
+        for u, v, d in zip(data['source'].tolist(), data['target'].tolist(), data['dist'].tolist())
+    )
+    return G
+
+
+def _read_topology_arrays(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
 def haversine_heuristic(u, v, G):
     """
     Heuristic function for A* algorithm using Haversine distance between nodes.
@@ -1,14 +1,47 @@
+import numpy as np
 import networkx as nx
 
-def compute_latencies_for_experiment(G, k, controllers, clusters):
+from algorithms.delay_matrix import sequential_row_sums
+from algorithms.topology import as_networkx
+from algorithms.advanced_k_means import advanced_k_means, advanced_k_means_sweep
+
+def iter_placements(fn, G, kmax, delay_matrix):
+    """
+    Yields the placements of a deterministic clustering function for k = 1..kmax: from one
+    advanced_k_means_sweep pass if fn is the stock advanced_k_means (same results), from
+    fn(G, k, delay_matrix=delay_matrix) for every k otherwise.
+
+    Args:
+        fn (callable): Clustering function, e.g. clustering_fns["advanced_k_means"].
+        G (networkx.Graph or Topology): The network graph with delay weights on edges (attribute "delay_ms").
+        kmax (int): Max number of controllers.
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays.
+
+    Yields:
+        tuple: (k, controllers, clusters) for k = 1..kmax.
+    """
+    if fn is advanced_k_means:
+        for k, controllers, clusters, _ in advanced_k_means_sweep(G, kmax, delay_matrix):
+            yield k, controllers, clusters
+        return
+    for k in range(1, kmax + 1):
+        yield (k, *fn(G, k, delay_matrix=delay_matrix))
+
+def compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix=None):
     """
     Computes average and maximum propagation latencies for controller placement experiments.
 
+    Delays are read from the delay matrix when given; otherwise one single-source Dijkstra
+    is run per controller (k runs instead of one shortest path search per node).
+    They are summed controller by controller, the members of a cluster in node order (not
+    the set iteration order, which may change when clusters are pickled between processes).
+
     Args:
-        G (networkx.Graph): The network graph with delay weights on edges (attribute "delay_ms").
+        G (networkx.Graph or Topology): The network graph with delay weights on edges (attribute "delay_ms").
         controllers_list (list): List of controllers' lists for each k (e.g., [controllers_k1, controllers_k2, ...]).
         clusters_list (list): List of clusters' dicts for each k (e.g., [clusters_k1, clusters_k2, ...]).
             Each clusters dict: {controller: [node1, node2, ...], ...}
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
 
     Returns:
         avg_delays (list of float): Average propagation latency for each k.
@@ -19,14 +52,20 @@ def compute_latencies_for_experiment(G, k, controllers, clusters):
 
     # For each experiment (value of k, i.e., number of controllers)
 
+    if delay_matrix is None:
+        position = {node: i for i, node in enumerate(G.nodes())}
+
     delays = []
     for ctrl in controllers:
-        for node in clusters[ctrl]:
-            # Do not consider latency of controller (it is 0.0)
-            if node != ctrl:
-                # Calculate shortest path delay from node to controller
-                delay = nx.shortest_path_length(G, source=node, target=ctrl, weight="delay_ms")
-                delays.append(delay)
+        # Do not consider latency of controller (it is 0.0)
+        members = [node for node in clusters[ctrl] if node != ctrl]
+        if delay_matrix is not None:
+            # Shortest path delay from node to controller
+            column = delay_matrix.columns([delay_matrix.index[ctrl]])[:, 0]
+            delays.extend(column[np.sort(delay_matrix.indices(members))].tolist())
+        else:
+            lengths = nx.single_source_dijkstra_path_length(as_networkx(G), ctrl, weight="delay_ms")
+            delays.extend(lengths[node] for node in sorted(members, key=position.get))
     total_delay = sum(delays)
     num_nodes = G.number_of_nodes() - k
     avg_latency = total_delay / num_nodes if num_nodes else 0.0
@@ -36,3 +75,57 @@ def compute_latencies_for_experiment(G, k, controllers, clusters):
     max_delays.append(max_latency)
 
     return avg_delays, max_delays
+
+def evaluate_placements(delay_matrix, placements, percentiles=None):
+    """
+    Evaluates a batch of controller placements in one call: every node's delay to its assigned
+    controller is gathered from the delay matrix for all placements at once.
+
+    Latencies follow compute_latencies_for_experiment bit for bit: controllers themselves are
+    excluded, the delays are summed left to right in the same order (controller by controller,
+    cluster members in matrix order; see sequential_row_sums) and the average is taken over
+    (number of nodes - k).
+
+    Args:
+        delay_matrix (DelayMatrix): Precomputed all-pairs shortest path delays (dense).
+        placements (list): Tuples (k, controllers, clusters), clusters being {controller: nodes}.
+        percentiles (list of float, optional): Latency percentiles (0-100) to compute as well.
+
+    Returns:
+        dict: {
+            'avg_latency': np.ndarray of shape (N,),
+            'max_latency': np.ndarray of shape (N,),
+            'percentiles': np.ndarray of shape (N, P) (only if percentiles were requested)
+        }
+    """
+    n = len(delay_matrix)
+    # Row p lists the (node, controller) matrix indices of placement p in summation order
+    node_idx = np.zeros((len(placements), n), dtype=np.intp)
+    ctrl_idx = np.zeros((len(placements), n), dtype=np.intp)
+    counts = np.zeros(len(placements), dtype=np.intp)
+    ks = np.empty(len(placements))
+    for p, (k, controllers, clusters) in enumerate(placements):
+        ks[p] = k
+        for ctrl in controllers:
+            member_idx = np.sort(delay_matrix.indices([node for node in clusters[ctrl] if node != ctrl]))
+            end = counts[p] + len(member_idx)
+            node_idx[p, counts[p]:end] = member_idx
+            ctrl_idx[p, counts[p]:end] = delay_matrix.index[ctrl]
+            counts[p] = end
+
+    mask = np.arange(n) < counts[:, None]
+    delays = np.where(mask, delay_matrix.matrix[node_idx, ctrl_idx], 0.0)
+    num_nodes = n - ks
+    totals = sequential_row_sums(delays)
+    result = {
+        "avg_latency": np.divide(totals, num_nodes, out=np.zeros(len(placements)), where=num_nodes != 0),
+        "max_latency": delays.max(axis=1, initial=0.0),
+    }
+    if percentiles is not None:
+        masked = np.where(mask, delays, np.nan)
+        values = np.zeros((len(placements), len(percentiles)))
+        has_delays = counts > 0
+        if has_delays.any():
+            values[has_delays] = np.nanpercentile(masked[has_delays], percentiles, axis=1).T
+        result["percentiles"] = values
+    return result
@@ -2,6 +2,10 @@ import os
 import json
 import random
 from utils.data_utils import load_gml_to_delay_graph
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.helpers import compute_centralities
+from utils.experiment_utils import iter_placements
+from utils.results_utils import iter_placement_records
 
 from CONST import *
 
@@ -55,48 +59,76 @@ def run_and_save_controller_loads(
         }
     """
     os.makedirs(dir_path, exist_ok=True)
-    from copy import deepcopy
-    G_orig = load_gml_to_delay_graph(gml_file, propagation_speed_km_per_ms)
+    # Immutable array-backed topology: shared by every k without copies
+    G = load_gml_to_delay_graph(gml_file, propagation_speed_km_per_ms, compact=True)
+    delay_matrix = compute_delay_matrix(G)
     rng = random.Random(seed)
     kwargs = enhanced_k_means_kwargs or {}
-
-    txt_content_adv = "======= ADVANCED K-MEANS ======\n"
-    txt_content_enh = "======= ENHANCED K-MEANS ======\n"
+    # Centralities only depend on the graph: computed once for all k
+    betweenness, closeness = compute_centralities(G, delay_matrix)
 
     advanced_results = []
     enhanced_results = []
 
-    for k in range(1, k_max + 1):
-        # Use deepcopy to keep G pristine for both algorithms (in case of in-place changes)
-        G = deepcopy(G_orig)
+    # Advanced K-Means solutions for every k come from one incremental sweep (see iter_placements)
+    advanced_placements = iter_placements(clustering_fns["advanced_k_means"], G, k_max, delay_matrix)
 
+    for k in range(1, k_max + 1):
         # --- Advanced K-Means ---
-        adv_controllers, adv_clusters = clustering_fns["advanced_k_means"](G, k)
-        adv_load = compute_controller_load(adv_clusters)
-        adv_result = {
-            "k": k,
-            "controllers": list(map(int, adv_controllers)),
-            "controller_loads": adv_load["controller_loads"],
-            "max_controller_load": adv_load["max_controller_load"],
-            "clusters": {str(int(c)): list(map(int, members)) for c, members in adv_clusters.items()}
-        }
-        advanced_results.append(adv_result)
-
-        txt_content_adv += f"K = {k}: Max load = {adv_load['max_controller_load']}\n"
+        _, adv_controllers, adv_clusters = next(advanced_placements)
+        advanced_results.append(_load_result(k, adv_controllers, adv_clusters))
 
         # --- Enhanced K-Means ---
-        enh_controllers, enh_clusters = clustering_fns["enhanced_k_means"](G, k, rng, **kwargs)
-        enh_load = compute_controller_load(enh_clusters)
-        enh_result = {
-            "k": k,
-            "controllers": list(map(int, enh_controllers)),
-            "controller_loads": enh_load["controller_loads"],
-            "max_controller_load": enh_load["max_controller_load"],
-            "clusters": {str(int(c)): list(map(int, members)) for c, members in enh_clusters.items()}
+        enh_controllers, enh_clusters = clustering_fns["enhanced_k_means"](
+            G, k, rng, delay_matrix=delay_matrix,
+            betweenness=betweenness, closeness=closeness, **kwargs
+        )
+        enhanced_results.append(_load_result(k, enh_controllers, enh_clusters))
+
+    return _save_loads(advanced_results, enhanced_results)
+
+def save_placement_loads(placements):
+    """
+    Computes controller loads from precomputed placement records (first run of
+    Advanced K-Means and Enhanced K-Means for every k) and saves them in the same
+    format as run_and_save_controller_loads.
+
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+
+    Returns:
+        dict: {
+            'advanced_k_means': [result for each k],
+            'enhanced_k_means': [result for each k]
         }
-        enhanced_results.append(enh_result)
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    results = {}
+    for name in ("advanced_k_means", "enhanced_k_means"):
+        records = iter_placement_records(placements, name) if name in placements["algorithms"] else ()
+        results[name] = [
+            _load_result(record["k"], record["controllers"], record["clusters"])
+            for record in records if record["run"] == 0
+        ]
+    return _save_loads(results["advanced_k_means"], results["enhanced_k_means"])
+
+def _load_result(k, controllers, clusters):
+    load = compute_controller_load(clusters)
+    return {
+        "k": k,
+        "controllers": list(map(int, controllers)),
+        "controller_loads": load["controller_loads"],
+        "max_controller_load": load["max_controller_load"],
+        "clusters": {str(int(c)): list(map(int, members)) for c, members in clusters.items()}
+    }
 
-        txt_content_enh += f"K = {k}: Max load = {enh_load['max_controller_load']}\n"
+def _save_loads(advanced_results, enhanced_results):
+    txt_content_adv = "======= ADVANCED K-MEANS ======\n"
+    txt_content_enh = "======= ENHANCED K-MEANS ======\n"
+    for result in advanced_results:
+        txt_content_adv += f"K = {result['k']}: Max load = {result['max_controller_load']}\n"
+    for result in enhanced_results:
+        txt_content_enh += f"K = {result['k']}: Max load = {result['max_controller_load']}\n"
 
     # Save all advanced results in one file
     with open(f"{dir_path}/advanced_k-means_load.json", "w") as f:
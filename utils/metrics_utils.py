@@ -1,12 +1,14 @@
 import networkx as nx
 
+from algorithms.topology import as_networkx
+
 
 def calculate_response_times(G, controllers):
     """
     Unified method to calculate average and maximum propagation delays.
 
     Parameters:
-        G (nx.Graph): Network graph
+        G (nx.Graph or Topology): Network graph
         controllers (list): List of controller nodes
 
     Returns:
@@ -18,7 +20,7 @@ def calculate_response_times(G, controllers):
     try:
         # Calculate shortest paths from all controllers
         distances = nx.multi_source_dijkstra_path_length(
-            G,
+            as_networkx(G),
             controllers,
             weight='weight'
         )
@@ -0,0 +1,227 @@
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.delay_matrix import compute_delay_matrix
+from algorithms.helpers import compute_centralities
+from algorithms.enhanced_k_means import enhanced_k_means
+from algorithms.bounded_assignment import BoundedAssigner
+from utils.experiment_utils import compute_latencies_for_experiment
+from algorithms.instrumentation import Profiler
+
+# Graph, delay matrix, kwargs and algorithm function shared by all tasks of a worker process.
+# Filled once per worker by _init_worker, so tasks only carry (k, run, seed).
+_worker_state = {}
+
+
+def derive_seed(seed, k, run):
+    """
+    Derives an independent seed for a single (k, run) task of Enhanced K-Means++.
+    The seed only depends on the base seed, k and the run index, so results are
+    reproducible regardless of the number of workers and the task execution order.
+
+    Args:
+        seed (int): Base seed of the experiment.
+        k (int): Number of controllers.
+        run (int): Index of the stochastic run.
+
+    Returns:
+        int: 64-bit seed for random.Random.
+    """
+    state = np.random.SeedSequence(seed, spawn_key=(k, run)).generate_state(2, dtype=np.uint32)
+    return int(state[0]) << 32 | int(state[1])
+
+
+def _init_worker(
+    G, delay_matrix, enhanced_k_means_kwargs, profile=False, fn=enhanced_k_means, latencies=True, bounded=False
+):
+    _worker_state["G"] = G
+    _worker_state["delay_matrix"] = delay_matrix
+    _worker_state["kwargs"] = enhanced_k_means_kwargs
+    _worker_state["profile"] = profile
+    _worker_state["fn"] = fn
+    _worker_state["latencies"] = latencies
+    _worker_state["bounded"] = bounded
+
+
+def _run_enhanced_task(task):
+    k, run, task_seed, initial_center = task
+    G = _worker_state["G"]
+    rng = random.Random(task_seed)
+    profiler = Profiler() if _worker_state["profile"] else None
+    kwargs = _worker_state["kwargs"]
+    if _worker_state["bounded"]:
+        # The bounds of a BoundedAssigner belong to one run: a new one for every task
+        kwargs = dict(kwargs, assigner=BoundedAssigner(_worker_state["delay_matrix"], profiler))
+    controllers, clusters, iterations = _worker_state["fn"](
+        G, k, rng, delay_matrix=_worker_state["delay_matrix"],
+        initial_center=initial_center, profiler=profiler, return_iterations=True, **kwargs
+    )
+    avg_delay, max_delay = [None], [None]
+    if _worker_state["latencies"]:
+        avg_delay, max_delay = compute_latencies_for_experiment(
+            G, k, controllers, clusters, _worker_state["delay_matrix"]
+        )
+    result = {
+        "k": k,
+        "run": run,
+        "controllers": controllers,
+        "clusters": clusters,
+        "avg_latency": avg_delay[0],
+        "max_latency": max_delay[0],
+        "iterations": iterations,
+    }
+    if profiler is not None:
+        result["profile"] = profiler.to_dict()
+    return result
+
+
+def run_enhanced_k_means_parallel(
+    G,
+    k_values,
+    enhanced_runs,
+    seed,
+    enhanced_k_means_kwargs=None,
+    workers=None,
+    delay_matrix=None,
+    betweenness_samples=None,
+    profile=False,
+    fn=enhanced_k_means,
+    bounded=False
+):
+    """
+    Runs Enhanced K-Means++ enhanced_runs times for every k on a process pool.
+
+    Every (k, run) task gets its own random.Random seeded with derive_seed(seed, k, run).
+    The graph, the delay matrix and the centralities (computed once here unless given in
+    enhanced_k_means_kwargs) are sent to each worker once (pool initializer), not with every task.
+
+    Args:
+        G (nx.Graph): Network graph with delay weights on edges (attribute "delay_ms").
+        k_values (list): Numbers of controllers to test.
+        enhanced_runs (int): Number of stochastic runs for each k.
+        seed (int or None): Base seed for reproducibility.
+        enhanced_k_means_kwargs (dict): Weight arguments passed to enhanced_k_means.
+        workers (int, optional): Number of worker processes (default: all CPU cores).
+            With workers=1 the runs are executed in the current process.
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+        betweenness_samples (int, optional): Source samples for approximate betweenness (exact if None).
+        profile (bool): Collect a per-run profile (see algorithms.instrumentation).
+        fn (callable): Algorithm run by the workers, called with the arguments of enhanced_k_means
+            (including return_iterations=True), e.g. a functools.partial of it. Sent to the worker
+            processes, so it must be picklable (a module-level function).
+        bounded (bool): Run every task with its own BoundedAssigner (triangle-inequality bounded
+            assignment, same results; needs a dense DelayMatrix). Its pruned comparisons are
+            added to the profile of the run.
+
+    Returns:
+        dict: {k: [result for each run]}, each result being a dict with keys
+            'k', 'run', 'controllers', 'clusters', 'avg_latency', 'max_latency', 'iterations'
+            (local K-Means cycle passes of the run) (and 'profile', the Profiler.to_dict() of the run, if profile is True).
+    """
+    results_per_k = {k: [] for k in k_values}
+    for result in iter_enhanced_k_means_runs(
+        G, k_values, enhanced_runs, seed, enhanced_k_means_kwargs, workers,
+        delay_matrix, betweenness_samples, profile, fn, bounded=bounded
+    ):
+        results_per_k[result["k"]].append(result)
+    return results_per_k
+
+
+def iter_enhanced_k_means_runs(
+    G,
+    k_values,
+    enhanced_runs,
+    seed,
+    enhanced_k_means_kwargs=None,
+    workers=None,
+    delay_matrix=None,
+    betweenness_samples=None,
+    profile=False,
+    fn=enhanced_k_means,
+    latencies=True,
+    bounded=False
+):
+    """
+    Generator version of run_enhanced_k_means_parallel (same arguments and seeds): yields the
+    result of every (k, run) task in task order as soon as it is available, so the caller
+    can write it out instead of keeping all runs in memory.
+
+    With latencies=False the workers skip the latency evaluation ('avg_latency' and
+    'max_latency' are None), for callers that evaluate the runs of a k in one batch
+    (see evaluate_placements).
+
+    Yields:
+        dict: Result of one run, see run_enhanced_k_means_parallel.
+    """
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
+    kwargs = dict(enhanced_k_means_kwargs or {})
+    if "betweenness" not in kwargs or "closeness" not in kwargs:
+        kwargs["betweenness"], kwargs["closeness"] = compute_centralities(
+            G, delay_matrix, betweenness_samples, seed
+        )
+
+    # Resolve a None seed once, so all tasks derive from the same entropy
+    base_seed = np.random.SeedSequence(seed).entropy
+    tasks = [
+        (k, run, derive_seed(base_seed, k, run), None)
+        for k in k_values for run in range(enhanced_runs)
+    ]
+    yield from iter_enhanced_tasks(G, tasks, kwargs, workers, delay_matrix, profile, fn, latencies, bounded)
+
+
+def run_enhanced_tasks(
+    G, tasks, enhanced_k_means_kwargs, workers=None, delay_matrix=None, profile=False, fn=enhanced_k_means,
+    bounded=False
+):
+    """
+    Executes a list of Enhanced K-Means++ tasks on a process pool (or in the current
+    process for workers=1), sharing G, the delay matrix and the kwargs through the pool initializer.
+
+    Args:
+        G (nx.Graph): Network graph with delay weights on edges (attribute "delay_ms").
+        tasks (list): Tuples (k, run, task_seed, initial_center); initial_center may be None
+            to let enhanced_k_means select it from the weights in enhanced_k_means_kwargs.
+        enhanced_k_means_kwargs (dict): Keyword arguments passed to every enhanced_k_means call.
+        workers (int, optional): Number of worker processes (default: all CPU cores).
+        delay_matrix (DelayMatrix, optional): Precomputed all-pairs shortest path delays.
+        profile (bool): Collect a per-run profile (see algorithms.instrumentation).
+        fn (callable): Algorithm run by the workers (see run_enhanced_k_means_parallel).
+        bounded (bool): Bounded assignment in every task (see run_enhanced_k_means_parallel).
+
+    Returns:
+        list: One result dict per task (same order as tasks), see run_enhanced_k_means_parallel.
+    """
+    return list(iter_enhanced_tasks(
+        G, tasks, enhanced_k_means_kwargs, workers, delay_matrix, profile, fn, bounded=bounded
+    ))
+
+
+def iter_enhanced_tasks(
+    G, tasks, enhanced_k_means_kwargs, workers=None, delay_matrix=None, profile=False, fn=enhanced_k_means,
+    latencies=True, bounded=False
+):
+    """
+    Generator version of run_enhanced_tasks: yields one result dict per task, in task order,
+    as the workers complete them (without their latencies if latencies is False, see
+    iter_enhanced_k_means_runs).
+    """
+    if delay_matrix is None:
+        delay_matrix = compute_delay_matrix(G)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(G, delay_matrix, enhanced_k_means_kwargs, profile, fn, latencies, bounded)
+        for task in tasks:
+            yield _run_enhanced_task(task)
+        return
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(G, delay_matrix, enhanced_k_means_kwargs, profile, fn, latencies, bounded)
+    ) as executor:
+        yield from executor.map(_run_enhanced_task, tasks, chunksize=chunksize)
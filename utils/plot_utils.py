@@ -81,11 +81,13 @@ def plot_latency_comparison(
 
     color_map = {
         'advanced_k_means': '#003366',    # Pantone 540C
-        'enhanced_k_means': '#C8102E'     # Pantone 1797C
+        'enhanced_k_means': '#C8102E',    # Pantone 1797C
+        'swap_k_medoids': '#00843D'       # Pantone 348C
     }
     marker_map = {
         'advanced_k_means': 'o',
-        'enhanced_k_means': 's'
+        'enhanced_k_means': 's',
+        'swap_k_medoids': '^'
     }
     names = list(clustering_fns.keys())
     colors = [color_map.get(n, None) for n in names]
@@ -183,3 +185,44 @@ def plot_enhanced_kmeans_experiment(
         ytick_major=ytick_major2,
         fname=f"{output_dir}/4_{info_str} (150dpi).png"
     )
+
+# --- Benchmark: scaling curves on the synthetic graphs ---
+def plot_scaling(records, output_dir, prefix="synthetic_", show=False):
+    """
+    Plot wall time and peak memory against the number of nodes for every benchmarked step,
+    using the benchmark records of the synthetic graphs (see experiments.benchmark).
+    Steps run for several k are shown at their largest k.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    series = {}
+    for r in records:
+        if not r["graph"].startswith(prefix) or r["step"].startswith("latency_evaluation_"):
+            continue
+        series.setdefault(r["step"], {})
+        best = series[r["step"]].get(r["nodes"])
+        if best is None or (r["k"] or 0) > (best["k"] or 0):
+            series[r["step"]][r["nodes"]] = r
+
+    for metric, ylabel, fname in (
+        ("wall_time_s", "Wall Time [s]", "scaling_wall_time"),
+        ("peak_memory_mb", "Peak Memory [MB]", "scaling_peak_memory"),
+    ):
+        plt.figure(figsize=(12, 6))
+        for step, points in series.items():
+            nodes = sorted(points)
+            plt.plot(nodes, [points[n][metric] for n in nodes], marker="o",
+                     label=step.replace('_', ' ').title())
+        plt.xscale("log")
+        plt.yscale("log")
+        plt.xlabel("Number of Nodes")
+        plt.ylabel(ylabel)
+        plt.title(f"Scaling – {ylabel}")
+        plt.legend(loc="best")
+        plt.grid(True, which="both", linestyle=":")
+        plt.tight_layout()
+        plt.savefig(f"{output_dir}/{fname} (150dpi).png", bbox_inches='tight', dpi=150)
+        print(f"Plot saved: {output_dir}/{fname} (150dpi).png")
+        if show:
+            plt.show()
+        plt.close()
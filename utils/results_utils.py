@@ -1,9 +1,12 @@
 import os
 import json
-import random
+import math
+import itertools
 import numpy as np
 from utils.data_utils import load_gml_to_delay_graph
-from utils.experiment_utils import compute_latencies_for_experiment
+from algorithms.delay_matrix import compute_delay_matrix
+from utils.parallel_utils import run_enhanced_k_means_parallel
+from utils.experiment_utils import compute_latencies_for_experiment, iter_placements
 
 from CONST import *
 
@@ -16,7 +19,8 @@ def save_results_to_json(
     kmax,
     enhanced_runs,
     seed,
-    enhanced_k_means_kwargs=None
+    enhanced_k_means_kwargs=None,
+    workers=None
 ):
     """
     Args:
@@ -27,78 +31,392 @@ def save_results_to_json(
         enhanced_runs (int): Number of stochastic runs for each k for enhanced k-means.
         seed (int or None): Seed for reproducibility.
         enhanced_k_means_kwargs (dict): Weight arguments passed to enhanced_k_means_fn.
+        workers (int, optional): Worker processes for the enhanced k-means runs (default: all CPU cores).
 
     Saves:
         Results to 'results/' directory in enhanced_kmeans_results.json format.
     """
     os.makedirs(dir_path, exist_ok=True)
     G = load_gml_to_delay_graph(gml_file, propagation_speed_km_per_ms)
-    rng = random.Random(seed)
+    delay_matrix = compute_delay_matrix(G)
     kwargs = enhanced_k_means_kwargs or {}
 
-    enhanced_results = {
-        "runs": enhanced_runs,
-        "k_range": list(range(1, kmax + 1)),
-        "data": []
-    }
+    # Enhanced K-Means++ runs for all k, each run seeded from (seed, k, run)
+    runs_per_k = run_enhanced_k_means_parallel(
+        G, list(range(1, kmax + 1)), enhanced_runs, seed, kwargs, workers, delay_matrix,
+        fn=clustering_fns["enhanced_k_means"]
+    )
 
-    for k in range(1, kmax + 1):
-        avg_delays = []
-        centers_per_run = []
-        clusters_per_run = []
+    _save_enhanced_results(
+        (result for k in range(1, kmax + 1) for result in runs_per_k[k]), list(range(1, kmax + 1)), enhanced_runs
+    )
 
-        for run in range(enhanced_runs):
-            controllers, clusters = clustering_fns["enhanced_k_means"](G, k, rng, **kwargs)
-            centers_per_run.append(list(controllers))
-            # Ensure clusters are serializable as {str: list}
-            clusters_serializable = {str(int(c)): list(map(int, members)) for c, members in clusters.items()}
-            clusters_per_run.append(clusters_serializable)
+    # Final delays list after experiments of Advanced K-Means
+    avg_delays_advanced = []
 
-            avg_delay, _ = compute_latencies_for_experiment(G, k, controllers, clusters)
-            avg_delays.append(float(avg_delay[0]))  # avg_delay is [value], we want value
+    for k, controllers, clusters in iter_placements(clustering_fns["advanced_k_means"], G, kmax, delay_matrix):
 
-        # Statistics
-        mean = float(np.mean(avg_delays))
-        std = float(np.std(avg_delays))
-        max_v = float(np.max(avg_delays))
-        min_v = float(np.min(avg_delays))
+        # --- Advanced K-Means latency measurements ---
 
-        enhanced_results["data"].append({
-            "k": k,
-            "avg_delays": avg_delays,
-            "mean": mean,
-            "std": std,
-            "max": max_v,
-            "min": min_v,
-            "centers": centers_per_run,
-            "clusters": clusters_per_run,
-        })
+        advanced_avg, advanced_max = compute_latencies_for_experiment(G, k, controllers, clusters, delay_matrix)
 
-    with open(f"{dir_path}/enhanced_k-means_results.json", "w") as f:
-        json.dump(enhanced_results, f, indent=2)
-    print("Results successfully saved to results/enhanced_k-means_results.json")
+        # Experiments result lists for Advanced K-Means
+        avg_delays_advanced.append(np.mean(advanced_avg))
 
-    advanced_results = {
-        "k_range": list(range(1, kmax + 1)),
-        "data": []
+    _save_advanced_results(avg_delays_advanced, list(range(1, kmax + 1)))
+
+class ResultsWriter:
+    """
+    Appends placement records to an NDJSON file, one compact JSON object per line:
+    {"algorithm", "k", "run", "controllers", "clusters", "avg_latency", "max_latency"}
+    (clusters as {str(controller): [node ids]}, as in the results JSON files), plus
+    "iterations" when the record has it.
+
+    Used as a context manager; every record is flushed when written, so the records of
+    completed runs survive an interrupted experiment.
+    """
+
+    def __init__(self, path, mode="w"):
+        """
+        Args:
+            path (str): Output .ndjson file.
+            mode (str): "w" to overwrite the file, "a" to append to it.
+        """
+        self.path = path
+        self.mode = mode
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, self.mode)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+        self._file = None
+
+    def write(self, algorithm, result):
+        """
+        Writes one record.
+
+        Args:
+            algorithm (str): Algorithm name (e.g. "enhanced_k_means").
+            result (dict): Placement record with keys 'k', 'run', 'controllers', 'clusters',
+                'avg_latency' and 'max_latency' (see experiments.pipeline.compute_placements).
+        """
+        record = {
+            "algorithm": algorithm,
+            "k": int(result["k"]),
+            "run": int(result["run"]),
+            "controllers": list(map(int, result["controllers"])),
+            "clusters": {str(int(c)): list(map(int, members)) for c, members in result["clusters"].items()},
+            "avg_latency": float(result["avg_latency"]),
+            "max_latency": float(result["max_latency"]),
+        }
+        if result.get("iterations") is not None:
+            record["iterations"] = int(result["iterations"])
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+def iter_results(path, algorithm=None, k=None):
+    """
+    Reads the records of an NDJSON results file lazily, one line at a time.
+
+    Args:
+        path (str): File written by ResultsWriter.
+        algorithm (str, optional): Only yield the records of this algorithm.
+        k (int, optional): Only yield the records of this k.
+
+    Yields:
+        dict: One record (see ResultsWriter).
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if algorithm is not None and record["algorithm"] != algorithm:
+                continue
+            if k is not None and record["k"] != k:
+                continue
+            yield record
+
+def aggregate_results(path, algorithm=None, metric="avg_latency"):
+    """
+    Computes per (algorithm, k) statistics of an NDJSON results file in one streaming pass
+    (Welford's algorithm), without loading the records in memory.
+
+    Args:
+        path (str): File written by ResultsWriter.
+        algorithm (str, optional): Only aggregate the records of this algorithm.
+        metric (str): Aggregated record field ("avg_latency" or "max_latency").
+
+    Returns:
+        dict: {algorithm: {k: {"runs", "mean", "std", "min", "max"}}}, k in increasing order;
+            std is the population standard deviation (as np.std in the results JSON files).
+    """
+    stats = {}
+    for record in iter_results(path, algorithm):
+        value = record[metric]
+        s = stats.setdefault(record["algorithm"], {}).setdefault(
+            record["k"], {"runs": 0, "mean": 0.0, "m2": 0.0, "min": math.inf, "max": -math.inf}
+        )
+        s["runs"] += 1
+        delta = value - s["mean"]
+        s["mean"] += delta / s["runs"]
+        s["m2"] += delta * (value - s["mean"])
+        s["min"] = min(s["min"], value)
+        s["max"] = max(s["max"], value)
+
+    return {
+        name: {
+            k: {
+                "runs": s["runs"],
+                "mean": s["mean"],
+                "std": math.sqrt(s["m2"] / s["runs"]),
+                "min": s["min"],
+                "max": s["max"],
+            }
+            for k, s in sorted(per_k.items())
+        }
+        for name, per_k in stats.items()
     }
 
-    # Final delays list after experiments of Advanced K-Means
-    avg_delays_advanced = []
-    max_delays_advanced = []
+def iter_placement_records(placements, algorithm):
+    """
+    Yields the placement records of one algorithm in k order (all runs of a k together), with
+    their clusters. If compute_placements did not keep the clusters in memory (keep_clusters=False),
+    the records are read back one at a time from its NDJSON results file (see ResultsWriter).
 
-    for k_idx, k in enumerate(range(1, kmax + 1)):
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+        algorithm (str): Algorithm name.
 
-        # --- Advanced K-Means latency measurements ---
-        controllers, clusters = clustering_fns["advanced_k_means"](G, k)
+    Yields:
+        dict: Record with at least the keys 'k', 'run', 'controllers', 'clusters' (mapping
+            {controller node id: assigned node ids}), 'avg_latency' and 'max_latency'.
+    """
+    if placements.get("keep_clusters", True):
+        records = placements["algorithms"][algorithm]
+        for k in placements["k_values"]:
+            yield from records.get(k, [])
+        return
+    for record in iter_results(placements["results_path"], algorithm):
+        record["clusters"] = {int(c): members for c, members in record["clusters"].items()}
+        yield record
 
-        advanced_avg, advanced_max = compute_latencies_for_experiment(G, k, controllers, clusters)
+def save_placements_to_json(placements):
+    """
+    Writes the results JSON files from precomputed placement records
+    (same format as save_results_to_json).
 
-        # Experiments result lists for Advanced K-Means
-        avg_delays_advanced.append(np.mean(advanced_avg))
-        max_delays_advanced.append(np.max(advanced_max))
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
 
-    for k_idx, k in enumerate(range(1, kmax + 1)):
+    Saves:
+        Results to 'results/' directory in enhanced_kmeans_results.json format.
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    k_values = placements["k_values"]
+    algorithms = placements["algorithms"]
+
+    if "enhanced_k_means" in algorithms:
+        _save_enhanced_results(iter_placement_records(placements, "enhanced_k_means"), k_values, placements["runs"])
+    if "advanced_k_means" in algorithms:
+        avg_delays_advanced = [algorithms["advanced_k_means"][k][0]["avg_latency"] for k in k_values]
+        _save_advanced_results(avg_delays_advanced, k_values)
+
+def save_placements_to_npz(placements):
+    """
+    Writes the placement records of every algorithm in the compact binary format of
+    write_placements_npz, one file per algorithm.
+
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+
+    Saves:
+        results/<topology>/<algorithm>_placements.npz (load with PlacementResults).
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    nodes = list(placements["graph"].nodes())
+    for name in placements["algorithms"]:
+        path = f"{dir_path}/{name.replace('_', '-')}_placements.npz"
+        write_placements_npz(path, nodes, iter_placement_records(placements, name))
+        print(f"Placements successfully saved to {path}")
+
+def write_placements_npz(path, nodes, records, compressed=False):
+    """
+    Writes placement records in a columnar binary format (.npz): every placement is stored as
+    an int32 assignment vector (for every node, the position of its controller in the center
+    list, -1 if unassigned) plus its center list, next to per-record k, run and latencies.
+
+    Arrays: nodes (n,), labels (records, n), centers (concatenated center lists),
+    center_offsets (records + 1,), k, run, avg_latency, max_latency (records,).
+
+    Args:
+        path (str): Output .npz file.
+        nodes (list): Node IDs (integers) in label order, e.g. list(G.nodes()).
+        records (iterable): Dicts with keys 'k', 'run', 'controllers', 'clusters',
+            'avg_latency' and 'max_latency' (see experiments.pipeline.compute_placements).
+        compressed (bool): Use np.savez_compressed (smaller, slower to load).
+    """
+    index = {n: i for i, n in enumerate(nodes)}
+    labels, centers, offsets = [], [], [0]
+    columns = {"k": [], "run": [], "avg_latency": [], "max_latency": []}
+    for record in records:
+        label = np.full(len(nodes), -1, dtype=np.int32)
+        for j, c in enumerate(record["controllers"]):
+            members = record["clusters"].get(c, ())
+            label[np.fromiter((index[m] for m in members), dtype=np.intp, count=len(members))] = j
+        labels.append(label)
+        centers.extend(int(c) for c in record["controllers"])
+        offsets.append(len(centers))
+        for key in columns:
+            columns[key].append(record[key])
+
+    save = np.savez_compressed if compressed else np.savez
+    save(
+        path,
+        nodes=np.asarray(nodes, dtype=np.int64),
+        labels=np.array(labels, dtype=np.int32).reshape(len(labels), len(nodes)),
+        centers=np.array(centers, dtype=np.int64),
+        center_offsets=np.array(offsets, dtype=np.int64),
+        k=np.array(columns["k"], dtype=np.int32),
+        run=np.array(columns["run"], dtype=np.int32),
+        avg_latency=np.array(columns["avg_latency"], dtype=float),
+        max_latency=np.array(columns["max_latency"], dtype=float),
+    )
+
+class PlacementResults:
+    """
+    Placement records read from a file written by write_placements_npz. The arrays are
+    loaded at once; the controller lists and cluster dicts of the current format are only
+    rebuilt for the records that are asked for.
+
+    Attributes:
+        nodes (np.ndarray): Node IDs in label order.
+        labels (np.ndarray): int32 array (records, n) of controller positions.
+        k, run (np.ndarray): k and run index of every record.
+        avg_latency, max_latency (np.ndarray): Latencies of every record.
+    """
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.nodes = data["nodes"]
+            self.labels = data["labels"]
+            self.k = data["k"]
+            self.run = data["run"]
+            self.avg_latency = data["avg_latency"]
+            self.max_latency = data["max_latency"]
+            self._centers = data["centers"]
+            self._offsets = data["center_offsets"]
+
+    def __len__(self):
+        return len(self.k)
+
+    def k_values(self):
+        """
+        Returns:
+            list: Distinct k values in increasing order.
+        """
+        return np.unique(self.k).tolist()
+
+    def indices(self, k):
+        """
+        Returns:
+            np.ndarray: Positions of the records of k, in file order.
+        """
+        return np.flatnonzero(self.k == k)
+
+    def controllers(self, i):
+        """
+        Returns:
+            list: Controller node IDs of record i.
+        """
+        return self._centers[self._offsets[i]:self._offsets[i + 1]].tolist()
+
+    def clusters(self, i):
+        """
+        Returns:
+            dict: Mapping {controller node id: set of assigned node ids} of record i.
+        """
+        label = self.labels[i]
+        return {
+            c: set(self.nodes[label == j].tolist())
+            for j, c in enumerate(self.controllers(i))
+        }
+
+    def record(self, i):
+        """
+        Returns:
+            dict: Record i with keys 'k', 'run', 'controllers', 'clusters', 'avg_latency' and
+                'max_latency', as in experiments.pipeline.compute_placements.
+        """
+        return {
+            "k": int(self.k[i]),
+            "run": int(self.run[i]),
+            "controllers": self.controllers(i),
+            "clusters": self.clusters(i),
+            "avg_latency": float(self.avg_latency[i]),
+            "max_latency": float(self.max_latency[i]),
+        }
+
+    def records_per_k(self):
+        """
+        Returns:
+            dict: {k: [record for each run]}, the form of placements["algorithms"][name].
+        """
+        return {k: [self.record(i) for i in self.indices(k)] for k in self.k_values()}
+
+def _save_enhanced_results(records, k_values, enhanced_runs):
+    path = f"{dir_path}/enhanced_k-means_results.json"
+    with open(path, "w") as f:
+        # Same layout as json.dump(..., indent=2) of the whole document, but the "data" entries
+        # are written one k at a time, so the clusters of all runs are never held at once
+        f.write(json.dumps({"runs": enhanced_runs, "k_range": list(k_values)}, indent=2)[:-2])
+        f.write(',\n  "data": [')
+        separator = "\n"
+        for k, k_records in itertools.groupby(records, key=lambda record: record["k"]):
+            avg_delays = []
+            centers_per_run = []
+            clusters_per_run = []
+
+            for result in k_records:
+                controllers, clusters = result["controllers"], result["clusters"]
+                centers_per_run.append(list(controllers))
+                # Ensure clusters are serializable as {str: list}
+                clusters_serializable = {str(int(c)): list(map(int, members)) for c, members in clusters.items()}
+                clusters_per_run.append(clusters_serializable)
+
+                avg_delays.append(float(result["avg_latency"]))
+
+            # Statistics
+            mean = float(np.mean(avg_delays))
+            std = float(np.std(avg_delays))
+            max_v = float(np.max(avg_delays))
+            min_v = float(np.min(avg_delays))
+
+            entry = json.dumps({
+                "k": k,
+                "avg_delays": avg_delays,
+                "mean": mean,
+                "std": std,
+                "max": max_v,
+                "min": min_v,
+                "centers": centers_per_run,
+                "clusters": clusters_per_run,
+            }, indent=2)
+            f.write(separator + "\n".join("    " + line for line in entry.split("\n")))
+            separator = ",\n"
+        f.write("\n  ]\n}" if separator != "\n" else "]\n}")
+    print("Results successfully saved to results/enhanced_k-means_results.json")
+
+def _save_advanced_results(avg_delays_advanced, k_values):
+    advanced_results = {
+        "k_range": list(k_values),
+        "data": []
+    }
+
+    for k_idx, k in enumerate(k_values):
         avg_delay = float(avg_delays_advanced[k_idx])
         advanced_results["data"].append({
             "k": k,
@@ -107,4 +425,30 @@ def save_results_to_json(
 
     with open(f"{dir_path}/advanced_k-means_results.json", "w") as f:
         json.dump(advanced_results, f, indent=2)
-    print("Results successfully saved to results/advanced_k-means_results.json")
\ No newline at end of file
+    print("Results successfully saved to results/advanced_k-means_results.json")
+
+def save_placement_profiles(placements):
+    """
+    Writes the per-run profiles collected with profile=True (see experiments.pipeline.compute_placements)
+    next to the results JSON files, one file per algorithm.
+
+    Args:
+        placements (dict): Placement records as returned by experiments.pipeline.compute_placements.
+
+    Saves:
+        results/<topology>/<algorithm>_profile.json with {"topology": topology loading profile,
+        "data": [{"k", "run", "profile"}]}.
+    """
+    os.makedirs(dir_path, exist_ok=True)
+    for name, records in placements["algorithms"].items():
+        data = [
+            {"k": record["k"], "run": record["run"], "profile": record["profile"]}
+            for k in placements["k_values"] for record in records.get(k, [])
+            if "profile" in record
+        ]
+        if not data:
+            continue
+        path = f"{dir_path}/{name.replace('_', '-')}_profile.json"
+        with open(path, "w") as f:
+            json.dump({"topology": placements.get("profile"), "data": data}, f, indent=2)
+        print(f"Profiles successfully saved to {path}")
@@ -0,0 +1,163 @@
+import math
+import argparse
+
+import numpy as np
+import networkx as nx
+
+from utils.data_utils import write_topology_npz
+
+# Mean Earth radius used for the great-circle edge lengths
+EARTH_RADIUS_KM = 6371.0
+
+# Default bounding box (lat_min, lat_max, lon_min, lon_max) of the generated nodes: Europe
+DEFAULT_REGION = (35.0, 60.0, -10.0, 30.0)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km (NumPy arrays or floats, in degrees).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def generate_wan_topology(
+    n,
+    avg_degree=2.6,
+    preferential=1.0,
+    locality=8,
+    cities=None,
+    region=DEFAULT_REGION,
+    seed=None,
+    name=None,
+):
+    """
+    Generates a connected, geographically embedded WAN-like topology.
+
+    Nodes are scattered around "cities" (Gaussian clusters with Zipf-distributed sizes) inside
+    the region. They are then attached one at a time: each new node links to 1 + Poisson(m - 1)
+    of its `locality` nearest already attached nodes, with m = avg_degree / 2, chosen with
+    probability proportional to (degree + 1) ** preferential. The first node is linked to the
+    rest through this process, so the graph is always connected.
+
+    The degree distribution is tuned with preferential (0: narrow, purely geographic degrees;
+    larger values: a few high degree hubs, as in the Topology Zoo networks) and locality
+    (how far a hub can reach). Edge lengths are great-circle distances.
+
+    Args:
+        n (int): Number of nodes.
+        avg_degree (float): Target average degree (at least 2).
+        preferential (float): Exponent of the degree preference (>= 0).
+        locality (int): Number of nearest attached nodes considered for the links of a node.
+        cities (int, optional): Number of node clusters (default: n // 25, at least 1).
+        region (tuple): Bounding box (lat_min, lat_max, lon_min, lon_max) in degrees.
+        seed (int, optional): Seed for reproducibility.
+        name (str, optional): Graph name (default: "synthetic_<n>").
+
+    Returns:
+        nx.Graph: Graph with integer node ids, node attributes 'label', 'lat', 'lon' and the edge
+            attribute 'dist' (km), as read from a GML file by load_gml_to_delay_graph
+            (use utils.data_utils.add_delay_attributes to add the delays).
+    """
+    if avg_degree < 2:
+        raise ValueError("avg_degree must be at least 2 for a connected topology.")
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = region
+    cities = cities or max(1, n // 25)
+
+    # Node positions: Gaussian clusters around the cities, Zipf-like city sizes
+    city_lat = rng.uniform(lat_min, lat_max, cities)
+    city_lon = rng.uniform(lon_min, lon_max, cities)
+    city_size = 1.0 / np.arange(1, cities + 1)
+    city = rng.choice(cities, size=n, p=city_size / city_size.sum())
+    spread = 0.5 / math.sqrt(cities)
+    lat = np.clip(city_lat[city] + rng.normal(0.0, spread * (lat_max - lat_min), n), lat_min, lat_max)
+    lon = np.clip(city_lon[city] + rng.normal(0.0, spread * (lon_max - lon_min), n), lon_min, lon_max)
+
+    # Uniform grid of attached nodes, about `locality` nodes per cell once all are attached
+    cells_per_axis = max(1, int(math.sqrt(n / max(locality, 1))))
+    cell_lat = np.minimum(((lat - lat_min) / (lat_max - lat_min) * cells_per_axis).astype(int), cells_per_axis - 1)
+    cell_lon = np.minimum(((lon - lon_min) / (lon_max - lon_min) * cells_per_axis).astype(int), cells_per_axis - 1)
+    grid = {}
+
+    degree = np.zeros(n)
+    extra_links = rng.poisson(max(avg_degree / 2.0 - 1.0, 0.0), n)
+    edges = []
+    for i in range(n):
+        if i > 0:
+            candidates = _nearest_attached(grid, cell_lat[i], cell_lon[i], cells_per_axis, locality)
+            dists = haversine_km(lat[i], lon[i], lat[candidates], lon[candidates])
+            nearest = np.argsort(dists, kind="stable")[:locality]
+            candidates, dists = candidates[nearest], dists[nearest]
+            weights = (degree[candidates] + 1.0) ** preferential
+            links = min(1 + extra_links[i], len(candidates))
+            chosen = rng.choice(len(candidates), size=links, replace=False, p=weights / weights.sum())
+            for c in chosen:
+                edges.append((int(candidates[c]), i, round(float(dists[c]), 2)))
+                degree[candidates[c]] += 1
+                degree[i] += 1
+        grid.setdefault((cell_lat[i], cell_lon[i]), []).append(i)
+
+    G = nx.Graph(name=name or f"synthetic_{n}")
+    G.add_nodes_from(
+        (i, {'label': str(i), 'lat': round(float(lat[i]), 4), 'lon': round(float(lon[i]), 4)})
+        for i in range(n)
+    )
+    G.add_edges_from((u, v, {'dist': d}) for u, v, d in edges)
+    return G
+
+
+def _nearest_attached(grid, row, col, cells_per_axis, count):
+    # Scans rings of grid cells around (row, col) until `count` attached nodes are found; one more
+    # ring is added, so that nodes just outside the first ring are not missed
+    found = []
+    radius = 0
+    extra_ring = False
+    while radius <= cells_per_axis:
+        for r in range(row - radius, row + radius + 1):
+            for c in range(col - radius, col + radius + 1):
+                if max(abs(r - row), abs(c - col)) == radius:
+                    found.extend(grid.get((r, c), ()))
+        if extra_ring:
+            break
+        if len(found) >= count:
+            extra_ring = True
+        radius += 1
+    return np.array(found, dtype=np.intp)
+
+
+def write_topology(G, path):
+    """
+    Writes a generated topology as GML (.gml) or in the binary format of
+    utils.data_utils.write_topology_npz (.npz); both can be loaded with load_gml_to_delay_graph.
+
+    Args:
+        G (nx.Graph): Topology (see generate_wan_topology).
+        path (str): Output file, .gml or .npz.
+    """
+    if path.endswith(".npz"):
+        write_topology_npz(G, path)
+    else:
+        nx.write_gml(G, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic WAN-like topology generator.")
+    parser.add_argument("nodes", type=int)
+    parser.add_argument("output", help="Output file (.gml or .npz)")
+    parser.add_argument("--avg-degree", type=float, default=2.6)
+    parser.add_argument("--preferential", type=float, default=1.0)
+    parser.add_argument("--locality", type=int, default=8)
+    parser.add_argument("--cities", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    G = generate_wan_topology(
+        args.nodes, args.avg_degree, args.preferential, args.locality, args.cities, seed=args.seed
+    )
+    write_topology(G, args.output)
+    degrees = [d for _, d in G.degree()]
+    print(f"{args.output}: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges, "
+          f"avg degree {np.mean(degrees):.2f}, max degree {max(degrees)}")